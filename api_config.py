@@ -1,6 +1,5 @@
 import os
 import dotenv
-import socket
 from base_logger import logger
 
 
@@ -43,16 +42,64 @@ LANGUAGE_PAIRS = {
 TOKEN = os.getenv("TOKEN", "APITOKEN")
 DOCS_URL = os.getenv("DOCS_URL", "/api/v1/docs")
 API_VERSION = os.getenv("API_VERSION", "v1")
+# Number of uvicorn worker processes serving requests
+WORKERS = int(os.getenv("WORKERS", 1))
+
+# Batch translate limits: lookups per request and characters per item_name (the column width)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 1000))
+BATCH_MAX_TEXT_LENGTH = 255
+# Search limits: characters per query and results per request
+SEARCH_MAX_QUERY_LENGTH = 255
+SEARCH_MAX_RESULTS = 50
+
+# Cache-Control for /dict and /md5; responses carry ETag/Last-Modified so caches can revalidate
+DICT_CACHE_CONTROL = os.getenv("DICT_CACHE_CONTROL", "public, max-age=0, must-revalidate")
+
+# Number of past generations of each dictionary kept for /dict/{game}/{lang}/diff
+DICT_HISTORY_DEPTH = int(os.getenv("DICT_HISTORY_DEPTH", 10))
+
+# Upstream Settings
+# Raw-file base URLs of the data repositories (override e.g. to point at a mirror)
+STARRAIL_DATA_URL = os.getenv("STARRAIL_DATA_URL", "https://gitlab.com/Dimbreath/turnbasedgamedata/-/raw/main/")
+ZZZ_DATA_URL = os.getenv("ZZZ_DATA_URL", "https://git.mero.moe/dimbreath/ZenlessData/raw/branch/master/")
+# Downloaded upstream files and their ETag/Last-Modified, reused while upstream reports no change
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+# Parallel downloads per refresh, attempts per file, first retry delay (doubles each time) and read timeout (seconds)
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", 8))
+FETCH_RETRIES = int(os.getenv("FETCH_RETRIES", 3))
+FETCH_BACKOFF = float(os.getenv("FETCH_BACKOFF", 1.0))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", 120))
+# Processes used to parse downloaded files (Genshin languages, TextMaps); 1 parses in the refresh thread
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+
+# Refresh Settings
+# What /refresh/{game} does while another game is refreshing: "queue" the job or "reject" it with 409
+REFRESH_POLICY = os.getenv("REFRESH_POLICY", "queue")
+# Seconds the cross-replica refresh lock outlives a crashed job (it is renewed while the job runs)
+REFRESH_LOCK_TTL = int(os.getenv("REFRESH_LOCK_TTL", 600))
+# Run each refresh in a spawned worker process so parsing and serialization do not stall request handling
+REFRESH_WORKER_PROCESS = os.getenv("REFRESH_WORKER_PROCESS", "1") == "1"
 
 # MySQL Settings
 DB_HOST = os.getenv('DB_HOST', None)
 if DB_HOST is None:
-    DB_HOST = socket.gethostbyname('host.docker.internal')
-logger.info(f"Using Docker gateway: {DB_HOST} as the MySQL host")
+    # Resolved by the driver on first connect rather than with a blocking lookup at import
+    DB_HOST = 'host.docker.internal'
+    logger.info(f"Using Docker gateway: {DB_HOST} as the MySQL host")
 DB_PORT = 3306
 DB_USER = os.environ['DB_USER']
 DB_PASSWORD = os.environ['DB_PASSWORD']
 DB_NAME = os.environ['DB_NAME']
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+
+# Cache Settings
+REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+# Serve lookups from an in-process copy of i18n_dict; Redis and MySQL are used until it is loaded
+MEMORY_INDEX_ENABLED = os.getenv("MEMORY_INDEX_ENABLED", "1") == "1"
+# TTL (seconds) of entries cached on a read-through miss, and of cached "not found" markers
+CACHE_TTL = int(os.getenv("CACHE_TTL", 86400))
+CACHE_MISS_TTL = int(os.getenv("CACHE_MISS_TTL", 60))
 
 game_name_id_map = {
     "genshin": 1,
@@ -60,3 +107,5 @@ game_name_id_map = {
     "zzz": 3
 }
 SENTRY_FULL_URL = os.getenv("SENTRY_FULL_URL", None)
+# Fraction of sampled transactions that are also profiled
+SENTRY_PROFILES_SAMPLE_RATE = float(os.getenv("SENTRY_PROFILES_SAMPLE_RATE", 1.0))
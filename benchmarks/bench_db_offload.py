@@ -0,0 +1,90 @@
+"""
+Concurrent throughput of /identify with blocking vs. offloaded DB access.
+
+Runs main.app in-process against SQLite and fakeredis with an artificial
+per-query delay that stands in for MySQL latency. Every request uses a
+distinct word so each one misses the cache and reaches the database.
+
+    pip install fakeredis
+    python benchmarks/bench_db_offload.py --requests 200 --concurrency 50 --delay-ms 20
+
+"blocking" runs the session work inline on the event loop, which is how the
+routes behaved before db.mysql_db.run_in_session existed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("DB_NAME", "bench")
+os.environ["MEMORY_INDEX_ENABLED"] = "0"
+
+import fakeredis  # noqa: E402
+import httpx  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import db.mysql_db as mysql_db  # noqa: E402
+from db.models import I18nDict  # noqa: E402
+
+
+def setup_database(delay: float, items: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    mysql_db.SessionLocal.configure(bind=engine)
+    mysql_db.Base.metadata.create_all(engine)
+    db = mysql_db.SessionLocal()
+    db.add_all(I18nDict(game_id=1, item_id=str(i), chs_text=f"物品{i}", en_text=f"Item {i}") for i in range(items))
+    db.commit()
+    db.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _simulate_latency(*_):
+        time.sleep(delay)
+
+
+async def run(mode: str, total: int, concurrency: int) -> float:
+    import main
+
+    async def inline_session(fn, *args):
+        db = mysql_db.SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+
+    main.run_in_session = inline_session if mode == "blocking" else mysql_db.run_in_session
+    main.app.state.redis = fakeredis.FakeAsyncRedis()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            async with semaphore:
+                resp = await client.get(f"/identify/genshin/Item {i}")
+                assert resp.status_code == 200, resp.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    setup_database(args.delay_ms / 1000, args.requests)
+    for mode in ("blocking", "offload"):
+        elapsed = asyncio.run(run(mode, args.requests, args.concurrency))
+        print(f"{mode:>8}: {args.requests} requests in {elapsed:.2f}s -> {args.requests / elapsed:.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Size and parse time of all.json (old indented, minified) vs. all.msgpack.
+
+Uses synthetic data shaped like the live dictionaries (see bench_search.py)
+and measures what a client does after downloading: decode the bytes into
+{lang: {text: item_id}}.
+
+    python benchmarks/bench_dict_formats.py --items 330
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("DB_NAME", "bench")
+
+import dict_store  # noqa: E402
+from bench_search import synthetic_entries  # noqa: E402
+from api_config import CORE_LANGUAGES  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=330)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = {}
+    for item_id, lang, text in synthetic_entries(random.Random(3), args.items):
+        rows.setdefault(item_id, {})[lang] = text
+    item_ids = sorted(rows)
+    names = {lang: [rows[i].get(lang, "") for i in item_ids] for lang in CORE_LANGUAGES}
+    all_dict = {lang: {text: i for i, text in zip(item_ids, names[lang]) if text} for lang in CORE_LANGUAGES}
+
+    formats = {
+        "json (indent=4)": (json.dumps(all_dict, indent=4, ensure_ascii=False).encode(), json.loads),
+        "json (minified)": (dict_store.dumps(all_dict), json.loads),
+        "msgpack columnar": (dict_store.pack_columnar("bench", item_ids, names), dict_store.unpack_columnar),
+    }
+    print(f"{args.items} items x {len(CORE_LANGUAGES)} languages")
+    for name, (data, decode) in formats.items():
+        assert decode(data) == all_dict
+        seconds = timeit.timeit(lambda: decode(data), number=args.repeat) / args.repeat
+        print(f"  {name:<17} {len(data) / 1024:8.1f} KB  gzip {len(gzip.compress(data, 9)) / 1024:7.1f} KB  "
+              f"parse {seconds * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Wall-clock time and peak memory of a Star Rail fetch: sequential httpx.get + json.loads (old) vs. fetcher.
+
+Serves synthetic ExcelOutput/TextMap files from a local HTTP server that adds a
+fixed delay per response and answers If-None-Match with 304, standing in for the
+upstream repository. Peak memory is the tracemalloc peak of a second, separate run
+of each variant with PARSE_WORKERS=1, so the parsing happens in the measured process
+(tracemalloc cannot see the parse worker processes). A last fetcher run against the
+unchanged files times the conditional ("not modified") path.
+
+    python benchmarks/bench_fetch.py --items 300 --delay 0.5 --filler 200000
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("DB_NAME", "bench")
+
+
+def starrail_files(rng: random.Random, items: int, filler: int):
+    """
+    {path: bytes} shaped like the Star Rail data: two configs plus one TextMap per
+    language holding the item names and `filler` unrelated strings.
+    """
+    from fetcher import STARRAIL_TEXTMAP_FILES
+
+    hashes = rng.sample(range(10 ** 9, 10 ** 10), items + filler)
+    avatars = [{"AvatarID": 1000 + i, "AvatarName": {"Hash": hashes[i]}} for i in range(items // 2)]
+    weapons = [{"EquipmentID": 20000 + i, "EquipmentName": {"Hash": hashes[i]}} for i in range(items // 2, items)]
+    files = {
+        "ExcelOutput/AvatarConfig.json": json.dumps(avatars).encode(),
+        "ExcelOutput/EquipmentConfig.json": json.dumps(weapons).encode(),
+    }
+    for lang, path in STARRAIL_TEXTMAP_FILES.items():
+        textmap = {str(h): f"{lang} text {h} " * 3 for h in hashes}
+        files[path] = json.dumps(textmap, ensure_ascii=False).encode()
+    return files
+
+
+def serve(files, delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = files.get(self.path.lstrip("/"))
+            time.sleep(delay)
+            if body is None:
+                self.send_error(404)
+                return
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--filler", type=int, default=50000, help="unrelated strings per TextMap")
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds added to every response")
+    args = parser.parse_args()
+
+    files = starrail_files(random.Random(5), args.items, args.filler)
+    server = serve(files, args.delay)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    import tempfile
+    import httpx
+    import fetcher
+    fetcher.STARRAIL_DATA_URL = base_url
+    fetcher.CACHE_DIR = tempfile.mkdtemp(prefix="uigf-bench-cache-")
+    parse_workers = fetcher.PARSE_WORKERS
+
+    print(f"{len(files)} files, {sum(map(len, files.values())) / 1024 / 1024:.1f} MB, "
+          f"{args.delay:.2f}s delay per response, concurrency {fetcher.FETCH_CONCURRENCY}, "
+          f"{parse_workers} parse workers")
+
+    def old_fetch():
+        # What fetch_starrail_update did before: every file fully parsed and held at once
+        return {path: json.loads(httpx.get(base_url + path).text) for path in files}
+
+    variants = {
+        "sequential + json.loads": old_fetch,
+        "fetch_starrail_update": lambda: fetcher.fetch_starrail_update(force=True),
+    }
+    for name, fetch in variants.items():
+        fetcher.PARSE_WORKERS = parse_workers
+        start = time.perf_counter()
+        fetch()
+        seconds = time.perf_counter() - start
+        fetcher.PARSE_WORKERS = 1
+        tracemalloc.start()
+        fetch()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {name:<24} {seconds:6.2f} s   peak {peak / 1024 / 1024:8.1f} MB")
+
+    # Every file is now cached with its ETag; a refresh without force only revalidates them
+    fetcher.commit_cache_meta("starrail")
+    start = time.perf_counter()
+    try:
+        fetcher.fetch_starrail_update()
+        outcome = "downloaded"
+    except fetcher.UpstreamNotModified:
+        outcome = "not modified"
+    print(f"  {'conditional re-fetch':<24} {time.perf_counter() - start:6.2f} s   ({outcome})")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Build time and query latency of the /search n-gram index.
+
+Uses synthetic names sized like the live dictionaries (items x 13 languages):
+Genshin ~330 items, Star Rail ~260, ZZZ ~210. Latin-script languages get
+multi-word syllable names, CJK/Thai languages get 2-6 character names, and a
+third of the items share their English name across the Latin languages, as
+proper names do in the real data.
+
+    python benchmarks/bench_search.py --queries 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.search_index import GameSearchIndex  # noqa: E402
+
+GAME_SIZES = {"genshin": 330, "starrail": 260, "zzz": 210}
+LATIN_LANGS = ["de", "en", "es", "fr", "id", "pt", "vi"]
+OTHER_LANGS = {"chs": (0x4E00, 0x9FFF), "cht": (0x4E00, 0x9FFF), "jp": (0x30A0, 0x30FF),
+               "kr": (0xAC00, 0xD7A3), "ru": (0x0430, 0x044F), "th": (0x0E01, 0x0E2E)}
+SYLLABLES = ["ka", "mi", "sa", "to", "ya", "ri", "no", "ra", "ze", "lu", "an", "el", "or", "vi", "qu", "fa"]
+
+
+def synthetic_entries(rng: random.Random, items: int):
+    for item_id in range(10000000, 10000000 + items):
+        english = " ".join(
+            "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+            for _ in range(rng.randint(1, 3))
+        )
+        shared = rng.random() < 0.33
+        for lang in LATIN_LANGS:
+            yield item_id, lang, english if shared or lang == "en" else english[::-1].title()
+        for lang, (lo, hi) in OTHER_LANGS.items():
+            yield item_id, lang, "".join(chr(rng.randint(lo, hi)) for _ in range(rng.randint(2, 6)))
+
+
+def mutate(rng: random.Random, text: str) -> str:
+    """Apply one typo: drop, swap or replace a character."""
+    if len(text) < 3:
+        return text
+    i = rng.randrange(len(text) - 1)
+    op = rng.choice(("drop", "swap", "replace"))
+    if op == "drop":
+        return text[:i] + text[i + 1:]
+    if op == "swap":
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + text[i + 1:]
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    for game, items in GAME_SIZES.items():
+        entries = list(synthetic_entries(rng, items))
+        start = time.perf_counter()
+        index = GameSearchIndex(entries)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        names = [text for _, _, text in entries]
+        workloads = {
+            "exact": [rng.choice(names) for _ in range(args.queries)],
+            "prefix": [(n := rng.choice(names))[:max(1, len(n) // 2)] for _ in range(args.queries)],
+            "typo": [mutate(rng, rng.choice(names)) for _ in range(args.queries)],
+        }
+        print(f"{game}: {len(entries)} names, {len(index.keys)} unique keys, built in {build_ms:.1f} ms")
+        for kind, queries in workloads.items():
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query, limit=10)
+                timings.append((time.perf_counter() - start) * 1e6)
+            print(f"  {kind:>6}: p50 {statistics.median(timings):7.1f} us  "
+                  f"p99 {percentile(timings, 99):7.1f} us  max {max(timings):7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Time to first 200: how long a freshly started server takes to answer requests.
+
+A scratch directory is populated with dictionaries, md5.json and index.snapshot
+for --items synthetic items per game (built through SQLite, gzip variants only).
+The server is then started --runs times in it, and each run reports:
+  first_200_md5        GET /md5/{game} answered from the loaded checksums
+  first_200_translate  POST /translate answered from the snapshot (checked against the expected item_id)
+No MySQL or Redis is needed: both point at closed ports, which a warm start
+must tolerate. Pass --command to time a PyInstaller bundle instead of main.py.
+
+    python benchmarks/bench_startup.py --items 50000
+    python benchmarks/bench_startup.py --command dist/main/main --output startup.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("DB_NAME", "bench")
+
+GAMES = ["genshin", "starrail", "zzz"]
+BASE_URL = "http://127.0.0.1:8900"
+
+
+# ------------------------------------------------------------------------
+# DATA
+# ------------------------------------------------------------------------
+def populate(scratch: str, items: int) -> Dict[str, Any]:
+    """
+    Publish the dictionary files of every game into scratch/dict and return one known (name, item_id).
+    """
+    from sqlalchemy import create_engine
+
+    import db.mysql_db as mysql_db
+    import dict_store
+    from api_config import CORE_LANGUAGES, game_name_id_map
+    from db import models
+
+    engine = create_engine(f"sqlite:///{os.path.join(scratch, 'bench.db')}")
+    mysql_db.Base.metadata.create_all(engine)
+    mysql_db.SessionLocal.configure(bind=engine)
+    # Compression level is irrelevant to startup; keep preparation quick
+    dict_store.ENCODINGS[:] = [("gzip", ".gz")]
+    import main
+
+    rng = random.Random(1)
+    db = mysql_db.SessionLocal()
+    try:
+        for game, game_id in game_name_id_map.items():
+            db.bulk_insert_mappings(models.I18nDict, [
+                {"game_id": game_id, "item_id": 10000 + i,
+                 **{f"{lang}_text": f"{lang}-{game}-{i}-{rng.randrange(1 << 30):x}" for lang in CORE_LANGUAGES}}
+                for i in range(items)
+            ])
+        db.commit()
+        for game in GAMES:
+            main.make_game_dict_files(db, game)
+        probe = db.query(models.I18nDict).filter_by(game_id=game_name_id_map["starrail"]).first()
+        # SQLite hands the String-mapped column back as text; the API returns numeric ids as ints, like MySQL's bigint
+        return {"name": probe.en_text, "item_id": int(probe.item_id)}
+    finally:
+        db.close()
+
+
+# ------------------------------------------------------------------------
+# MEASUREMENT
+# ------------------------------------------------------------------------
+def request(path: str, body: Optional[Dict[str, Any]] = None):
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(BASE_URL + path, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=2) as resp:
+        return resp.status, json.loads(resp.read())
+
+
+def wait_for(started: float, check, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            if check():
+                return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"No 200 within {timeout}s")
+
+
+def run_once(command: List[str], cwd: str, probe: Dict[str, Any], timeout: float) -> Dict[str, float]:
+    env = {**os.environ, "REDIS_HOST": "127.0.0.1:1", "DB_HOST": "127.0.0.1", "WORKERS": "1"}
+    env.pop("SENTRY_FULL_URL", None)
+    started = time.perf_counter()
+    server = subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        md5 = wait_for(started, lambda: request("/md5/starrail")[0] == 200, timeout)
+        translate = wait_for(started, lambda: request("/translate", {
+            "type": "normal", "lang": "en", "game": "starrail", "item_name": probe["name"],
+        })[1].get("item_id") == probe["item_id"], timeout)
+    finally:
+        server.terminate()
+        server.wait()
+    return {"first_200_md5": round(md5, 4), "first_200_translate": round(translate, 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=10000, help="items per game")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--command", help="server command (default: this interpreter running main.py)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for each run")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output) if args.output else None
+    command = shlex.split(args.command) if args.command else [sys.executable, os.path.join(ROOT, "main.py")]
+    scratch = tempfile.mkdtemp(prefix="uigf-startup-")
+    os.chdir(scratch)
+    logging.getLogger().setLevel(logging.WARNING)
+    probe = populate(scratch, args.items)
+    snapshot_bytes = sum(os.path.getsize(os.path.join("dict", game, "index.snapshot")) for game in GAMES)
+
+    runs = [run_once(command, scratch, probe, args.timeout) for _ in range(args.runs)]
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "command": " ".join(command),
+            "items": args.items,
+            "snapshot_bytes": snapshot_bytes,
+        },
+        "results": {
+            metric: {
+                "median": round(statistics.median(run[metric] for run in runs), 4),
+                "min": min(run[metric] for run in runs),
+                "max": max(run[metric] for run in runs),
+            }
+            for metric in runs[0]
+        },
+        "runs": runs,
+    }
+
+    output = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+End-to-end benchmark of main.app against local stand-ins, with machine-readable results.
+
+Nothing outside this process is needed:
+  - MySQL: a SQLite file in a scratch directory, or --db-url (e.g. a disposable MySQL database)
+  - Redis: fakeredis, or --redis-url (fakeredis runs in Python, so Redis-heavy
+    steps such as the cache update in db_load look slower than against a real server)
+  - upstreams: a local HTTP server serving synthetic Star Rail / ZZZ data files and a
+    Snap.Metadata-shaped ZIP for Genshin, each game with --items items and TextMaps of
+    --items + --filler entries per language
+
+Scenarios:
+  refresh_{game}            force_refresh_local_data(game, force=True) into an empty database
+  refresh_{game}_unchanged  the same again, when nothing changed upstream
+  translate                 POST /translate, one name -> item_id
+  translate_reverse         POST /translate, one item_id -> name
+  translate_list            POST /translate with a list of --list-size names
+  translate_batch           POST /translate/batch with --list-size lookups
+  identify                  GET /identify/{game}/{word}
+  dict_lang / dict_all      GET /dict/{game}/en.json and all.json
+Refreshes report seconds per phase; request scenarios report requests/s and
+latency percentiles over --requests requests at --concurrency.
+
+    pip install fakeredis
+    python benchmarks/bench_suite.py --items 100000 --output results.json
+    python benchmarks/bench_suite.py --items 100000 --baseline results.json --tolerance 0.2
+
+With --baseline the run exits with status 1 if any scenario got slower than the
+baseline by more than --tolerance (latency p50, refresh seconds) or lost that
+much throughput.
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("DB_NAME", "bench")
+os.environ.setdefault("GITHUB_TOKEN", "bench")
+# Refreshes run in this process so their phases can be timed directly
+os.environ["REFRESH_WORKER_PROCESS"] = "0"
+
+from bench_fetch import serve, starrail_files  # noqa: E402
+
+GAMES = ["genshin", "starrail", "zzz"]
+
+
+# ------------------------------------------------------------------------
+# SYNTHETIC UPSTREAMS
+# ------------------------------------------------------------------------
+def zzz_files(rng: random.Random, items: int, filler: int) -> Dict[str, bytes]:
+    """
+    {path: bytes} shaped like the ZZZ data; config field names are obfuscated upstream,
+    the fetcher finds them through Anbi's entry, which must come first.
+    """
+    from fetcher import ZZZ_TEXTMAP_FILES
+
+    keys = [f"Text_{i:08d}" for i in rng.sample(range(10 ** 8), items + filler)]
+    avatars = [{"KBNGJFPOKLE": 1011 + i, "PLMDNGEJHAK": "Avatar_Female_Size02_Anbi" if i == 0 else keys[i]}
+               for i in range(max(1, items // 10))]
+    weapons = [{"KBNGJFPOKLE": 10000 + i, "PLMDNGEJHAK": f"Item_Weapon_{keys[i]}"}
+               for i in range(len(avatars), items)]
+    names = {avatar["PLMDNGEJHAK"] for avatar in avatars} | {weapon["PLMDNGEJHAK"] for weapon in weapons}
+    files = {
+        "FileCfg/AvatarBaseTemplateTb.json": json.dumps({"GMNCBMLIHPE": avatars}).encode(),
+        "FileCfg/ItemTemplateTb.json": json.dumps({"GMNCBMLIHPE": weapons}).encode(),
+    }
+    for lang, path in ZZZ_TEXTMAP_FILES.items():
+        textmap = {key: f"{lang} name {key} " * 2 for key in sorted(names) + keys[items:]}
+        files[path] = json.dumps(textmap, ensure_ascii=False).encode()
+    return files
+
+
+def genshin_files(rng: random.Random, items: int) -> Dict[str, bytes]:
+    """
+    {path: bytes} with a Snap.Metadata-shaped ZIP (Weapon.json plus one file per avatar and language).
+    """
+    from fetcher import SNAP_METADATA_LANGS, SNAP_METADATA_ZIP_PREFIX
+
+    avatar_ids = [10000002 + i for i in range(max(1, items // 10))]
+    weapon_ids = rng.sample(range(11101, 11101 + items * 10), items - len(avatar_ids))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        root = f"{SNAP_METADATA_ZIP_PREFIX}/Genshin"
+        zf.writestr(f"{root}/CHS/Meta.json", json.dumps({f"Avatar/{i}": "0" for i in avatar_ids}))
+        for lang in SNAP_METADATA_LANGS:
+            zf.writestr(f"{root}/{lang}/Weapon.json", json.dumps(
+                [{"Id": i, "Name": f"{lang} weapon {i}"} for i in weapon_ids], ensure_ascii=False))
+            for i in avatar_ids:
+                zf.writestr(f"{root}/{lang}/Avatar/{i}.json", json.dumps({"Id": i, "Name": f"{lang} avatar {i}"}))
+    return {"genshin/main.zip": buffer.getvalue(), "genshin/commit": b"0123456789abcdef"}
+
+
+def start_upstreams(items: int, filler: int) -> Dict[str, int]:
+    import fetcher
+
+    rng = random.Random(22)
+    files = {}
+    for prefix, game_files in (("starrail/", starrail_files(rng, items, filler)),
+                               ("zzz/", zzz_files(rng, items, filler)),
+                               ("", genshin_files(rng, items))):
+        files.update({prefix + path: body for path, body in game_files.items()})
+    server = serve(files, 0.0)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    fetcher.STARRAIL_DATA_URL = base_url + "starrail/"
+    fetcher.ZZZ_DATA_URL = base_url + "zzz/"
+    fetcher.SNAP_METADATA_ZIP_URL = base_url + "genshin/main.zip"
+    fetcher.SNAP_METADATA_COMMIT_URL = base_url + "genshin/commit"
+    fetcher.GITHUB_TOKEN = "bench"
+    return {"files": len(files), "bytes": sum(map(len, files.values()))}
+
+
+# ------------------------------------------------------------------------
+# LOCAL DATABASE AND REDIS
+# ------------------------------------------------------------------------
+def setup_database(db_url: str):
+    from sqlalchemy import create_engine
+
+    import db.mysql_db as mysql_db
+    import metrics
+    from db import models  # noqa: F401  (registers the i18n_dict table)
+
+    connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else {}
+    engine = create_engine(db_url, connect_args=connect_args)
+    mysql_db.Base.metadata.drop_all(engine)
+    mysql_db.Base.metadata.create_all(engine)
+    mysql_db.SessionLocal.configure(bind=engine)
+    metrics.instrument_engine(engine)
+
+
+# ------------------------------------------------------------------------
+# SCENARIOS
+# ------------------------------------------------------------------------
+async def bench_refresh(game: str, redis_client) -> Dict[str, Any]:
+    import main
+
+    start = time.perf_counter()
+    result = await main.force_refresh_local_data(game, redis_client, force=True)
+    return {
+        "seconds": round(time.perf_counter() - start, 4),
+        "outcome": result.outcome,
+        "phases": {phase: round(seconds, 4) for phase, seconds in result.durations.items()},
+        "items": result.items,
+    }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def bench_requests(client, make_request: Callable[[int], Any], total: int, concurrency: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            resp = await make_request(i)
+            latencies.append(time.perf_counter() - started)
+            assert resp.status_code == 200, f"{resp.request.url}: {resp.status_code} {resp.text[:200]}"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": total,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+def sample_rows(game: str, count: int):
+    import db.mysql_db as mysql_db
+    from api_config import game_name_id_map
+    from db.models import I18nDict
+
+    db = mysql_db.SessionLocal()
+    try:
+        rows = db.query(I18nDict.item_id, I18nDict.en_text).filter(
+            I18nDict.game_id == game_name_id_map[game], I18nDict.en_text != "").all()
+    finally:
+        db.close()
+    return random.Random(7).sample(rows, min(count, len(rows)))
+
+
+async def run_suite(args) -> Dict[str, Any]:
+    import fakeredis
+    import httpx
+    import redis.asyncio as aioredis
+
+    import main
+
+    if args.redis_url:
+        redis_url = args.redis_url
+        main.cache.create_client = lambda host: aioredis.from_url(redis_url)
+    else:
+        server = fakeredis.FakeServer()
+        main.cache.create_client = lambda host: fakeredis.FakeAsyncRedis(server=server)
+    results: Dict[str, Any] = {}
+
+    redis_client = main.cache.create_client("bench")
+    await redis_client.flushdb()
+    for game in GAMES:
+        results[f"refresh_{game}"] = await bench_refresh(game, redis_client)
+        results[f"refresh_{game}_unchanged"] = await bench_refresh(game, redis_client)
+        print(f"refresh {game}: {results[f'refresh_{game}']['seconds']}s, "
+              f"unchanged {results[f'refresh_{game}_unchanged']['seconds']}s", file=sys.stderr)
+    await redis_client.aclose()
+
+    game = args.game
+    rows = sample_rows(game, 1000)
+    names = [name for _, name in rows]
+    ids = [item_id for item_id, _ in rows]
+    async with main.lifespan(main.app):
+        await main.app.state.index_task
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            scenarios = {
+                "translate": lambda i: client.post("/translate", json={
+                    "type": "normal", "lang": "en", "game": game, "item_name": names[i % len(names)]}),
+                "translate_reverse": lambda i: client.post("/translate", json={
+                    "type": "reverse", "lang": "en", "game": game, "item_id": ids[i % len(ids)]}),
+                # The list form of /translate takes the names as one JSON-encoded string
+                "translate_list": lambda i: client.post("/translate", json={
+                    "type": "normal", "lang": "en", "game": game, "item_name": json.dumps(
+                        [names[(i + k) % len(names)] for k in range(args.list_size)], ensure_ascii=False)}),
+                "translate_batch": lambda i: client.post("/translate/batch", json={"items": [
+                    {"type": "normal", "lang": "en", "game": game, "item_name": names[(i + k) % len(names)]}
+                    for k in range(args.list_size)]}),
+                "identify": lambda i: client.get(f"/identify/{game}/{names[i % len(names)]}"),
+                "dict_lang": lambda i: client.get(f"/dict/{game}/en.json"),
+                "dict_all": lambda i: client.get(f"/dict/{game}/all.json"),
+            }
+            for name, make_request in scenarios.items():
+                # Warm up (caches, lazily generated files) before measuring
+                await bench_requests(client, make_request, min(50, args.requests), args.concurrency)
+                results[name] = await bench_requests(client, make_request, args.requests, args.concurrency)
+                print(f"{name}: {results[name]['rps']} req/s, p50 {results[name]['p50_ms']} ms", file=sys.stderr)
+    return results
+
+
+# ------------------------------------------------------------------------
+# REGRESSION CHECK
+# ------------------------------------------------------------------------
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Human-readable regressions of current against baseline beyond tolerance (0.2 = 20%).
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        for key, higher_is_better in (("seconds", False), ("p50_ms", False), ("rps", True)):
+            if key not in result or key not in old or not old[key]:
+                continue
+            change = (result[key] - old[key]) / old[key]
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{name}.{key}: {old[key]} -> {result[key]} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1000, help="items per game")
+    parser.add_argument("--filler", type=int, default=0, help="extra unrelated TextMap entries per language")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per request scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--list-size", type=int, default=100, help="names per translate_list/translate_batch request")
+    parser.add_argument("--game", choices=GAMES, default="starrail", help="game used by the request scenarios")
+    parser.add_argument("--db-url", help="SQLAlchemy URL of a disposable database (default: SQLite in the scratch dir)")
+    parser.add_argument("--redis-url", help="URL of a disposable Redis (default: fakeredis); it is flushed")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    scratch = tempfile.mkdtemp(prefix="uigf-bench-")
+    os.chdir(scratch)
+    for game in GAMES:
+        os.makedirs(os.path.join("dict", game), exist_ok=True)
+    setup_database(args.db_url or f"sqlite:///{os.path.join(scratch, 'bench.db')}")
+    upstream = start_upstreams(args.items, args.filler)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": (args.db_url or "sqlite").split(":", 1)[0],
+            "redis": "redis" if args.redis_url else "fakeredis",
+            "items": args.items,
+            "filler": args.filler,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "list_size": args.list_size,
+            "game": args.game,
+            "upstream_files": upstream["files"],
+            "upstream_bytes": upstream["bytes"],
+        },
+        "results": asyncio.run(run_suite(args)),
+    }
+
+    output = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
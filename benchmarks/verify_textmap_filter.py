@@ -0,0 +1,114 @@
+"""
+Check the streaming TextMap parser against json.loads.
+
+Each case builds a random TextMap (escapes, \\u escapes with surrogate pairs,
+multi-byte UTF-8, numbers, literals, duplicate keys, compact or indented
+layout), feeds it to fetcher.TextMapFilter split at random byte offsets
+(including single bytes and cuts inside UTF-8 sequences) and asserts the
+result equals filtering json.loads' output. Every document cut short of its
+closing brace must be rejected with ValueError. Exits non-zero on the first
+mismatch, printing the seed of the failing case.
+
+    python benchmarks/verify_textmap_filter.py --cases 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("DB_NAME", "bench")
+
+from fetcher import TextMapFilter  # noqa: E402
+
+ALPHABET = ["a", "Z", "0", " ", '"', "\\", "/", "\n", "\t", "\x01", "é", "旷", "怨", "「", "」", "ア", "한",
+            "ไ", "€", " ", "😀", "𠀋"]
+LITERALS = [0, -1, 12.5, -0.25, 1e21, 3.0e-7, 123456789012, True, False, None, [], [1, "x"], {"k": [None]}]
+
+
+def random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 12)))
+
+
+def random_textmap(rng: random.Random, entries: int) -> tuple[bytes, set[str]]:
+    """
+    Serialize a random TextMap and pick the keys to keep, some of them absent.
+    """
+    keys = [str(rng.randint(0, 2 ** 32)) for _ in range(entries)]
+    keys += rng.sample(keys, min(len(keys), 3))  # duplicates: the last value wins
+    rng.shuffle(keys)
+    parts = []
+    for key in keys:
+        value = random_text(rng) if rng.random() < 0.8 else rng.choice(LITERALS)
+        ascii_only = rng.random() < 0.5
+        sep = rng.choice([":", ": ", " :\n\t"])
+        parts.append(f"{json.dumps(key, ensure_ascii=ascii_only)}{sep}{json.dumps(value, ensure_ascii=ascii_only)}")
+    joiner = rng.choice([",", ", ", ",\n    ", "\r\n,\r\n"])
+    document = rng.choice(["", " \n"]) + "{" + rng.choice(["", "\n  "]) + joiner.join(parts) + \
+        rng.choice(["", "\n"]) + "}" + rng.choice(["", "\n"])
+    wanted = set(rng.sample(keys, len(keys) // 3)) | {"missing", ""}
+    return document.encode("utf-8"), wanted
+
+
+def split(rng: random.Random, data: bytes) -> list[bytes]:
+    cuts = sorted(rng.sample(range(1, len(data)), min(len(data) - 1, rng.randint(0, 40))))
+    if rng.random() < 0.1:
+        cuts = list(range(1, len(data)))  # one byte at a time
+    bounds = [0] + cuts + [len(data)]
+    return [data[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def run_filter(chunks: list[bytes], wanted: set[str]) -> dict:
+    textmap = TextMapFilter(wanted)
+    for chunk in chunks:
+        textmap.feed(chunk)
+    return textmap.result()
+
+
+def check_case(seed: int, entries: int):
+    rng = random.Random(seed)
+    data, wanted = random_textmap(rng, rng.randint(0, entries))
+    expected = {key: value for key, value in json.loads(data).items() if key in wanted}
+    for _ in range(5):
+        chunks = split(rng, data)
+        try:
+            result = run_filter(chunks, wanted)
+        except ValueError as e:
+            raise AssertionError(f"rejected a valid TextMap split into {len(chunks)} chunks: {e}")
+        assert result == expected, f"mismatch: {result!r} != {expected!r}"
+
+    end = data.rstrip().rfind(b"}")
+    truncated = data[:rng.randrange(end)]
+    try:
+        run_filter(split(rng, truncated) if truncated else [], wanted)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError(f"accepted a document cut at byte {len(truncated)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", type=int, default=500)
+    parser.add_argument("--entries", type=int, default=60, help="maximum entries per TextMap")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for seed in range(args.seed, args.seed + args.cases):
+        try:
+            check_case(seed, args.entries)
+        except AssertionError as e:
+            print(f"case seed {seed}: {e}")
+            sys.exit(1)
+    print(f"{args.cases} TextMaps matched json.loads under random chunk splits "
+          f"in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from api_config import CACHE_MISS_TTL, CACHE_TTL, CORE_LANGUAGES
+from base_logger import logger
+from db.collation import KEY_VERSION, fold
+
+
+# ------------------------------------------------------------------------
+# KEY LAYOUT
+# ------------------------------------------------------------------------
+# uigf:game-{game_id}:{item_id}            -> JSON {"chs_text": ..., "en_text": ..., ...}
+#                                             "{}" marks a cached miss
+# uigf:game-{game_id}:name{v}:{lang}:{key} -> JSON list of item_ids whose text has collation key
+#                                             key (db.collation.fold, v is its KEY_VERSION),
+#                                             "[]" marks a cached miss
+# uigf:dict:checksums                      -> hash of game -> JSON {"checksum": {...}, "generated_at": ...},
+#                                             the published /md5 document of each game
+CHECKSUM_KEY = "uigf:dict:checksums"
+
+
+def item_key(game_id: int, item_id: Any) -> str:
+    return f"uigf:game-{game_id}:{item_id}"
+
+
+def text_key(game_id: int, lang: str, text: str) -> str:
+    return f"uigf:game-{game_id}:name{KEY_VERSION}:{lang}:{fold(text)}"
+
+
+def create_client(redis_host: str) -> aioredis.Redis:
+    pool = aioredis.ConnectionPool.from_url(f"redis://{redis_host}", db=0)
+    return aioredis.Redis(connection_pool=pool)
+
+
+def item_id_sort_key(item_id: Any):
+    """
+    Order item IDs numerically where possible, matching the bigint order in MySQL.
+    """
+    item_id = str(item_id)
+    return (0, int(item_id), "") if item_id.isdigit() else (1, 0, item_id)
+
+
+# ------------------------------------------------------------------------
+# READS
+# ------------------------------------------------------------------------
+async def get_many(redis_client: aioredis.Redis, keys: List[str]) -> List[Optional[Any]]:
+    """
+    MGET the given keys and decode their JSON values.
+
+    Missing keys (and any Redis failure) come back as None, so callers can treat
+    the cache as best-effort and fall through to MySQL.
+    """
+    if not keys:
+        return []
+    try:
+        raw_values = await redis_client.mget(keys)
+    except RedisError as e:
+        logger.warning(f"Redis read failed, falling back to MySQL: {e}")
+        return [None] * len(keys)
+    return [None if raw is None else json.loads(raw) for raw in raw_values]
+
+
+async def get_item_ids(redis_client: aioredis.Redis, game_id: int, lang: str,
+                       texts: List[str]) -> List[Optional[List[Any]]]:
+    return await get_many(redis_client, [text_key(game_id, lang, t) for t in texts])
+
+
+async def get_items(redis_client: aioredis.Redis, game_id: int,
+                    item_ids: List[Any]) -> List[Optional[Dict[str, str]]]:
+    return await get_many(redis_client, [item_key(game_id, i) for i in item_ids])
+
+
+async def get_text_in_all_languages(redis_client: aioredis.Redis, game_id: int,
+                                    text: str) -> List[Optional[List[Any]]]:
+    """
+    One MGET over the text keys of every core language, in CORE_LANGUAGES order.
+    """
+    return await get_many(redis_client, [text_key(game_id, lang, text) for lang in CORE_LANGUAGES])
+
+
+# ------------------------------------------------------------------------
+# WRITES
+# ------------------------------------------------------------------------
+async def set_many(redis_client: aioredis.Redis, values: Dict[str, Any], ttl: Optional[int] = None,
+                   miss_keys: Iterable[str] = (), miss_value: Any = ()):
+    """
+    Pipeline SETs for the given key -> value map plus "miss" markers.
+
+    Values are JSON encoded; miss keys are stored as miss_value with
+    CACHE_MISS_TTL so that unknown words do not hit MySQL on every request.
+    miss_value must not encode to "null", which get_many cannot tell from an absent key.
+    """
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.set(key, json.dumps(value, ensure_ascii=False), ex=ttl)
+        for key in miss_keys:
+            pipe.set(key, json.dumps(miss_value), ex=CACHE_MISS_TTL)
+        await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Redis write failed: {e}")
+
+
+async def cache_item_ids(redis_client: aioredis.Redis, game_id: int, lang: str,
+                         found: Dict[str, List[Any]], missed: Iterable[str]):
+    await set_many(
+        redis_client,
+        {text_key(game_id, lang, t): ids for t, ids in found.items()},
+        ttl=CACHE_TTL,
+        miss_keys=[text_key(game_id, lang, t) for t in missed],
+        miss_value=[],
+    )
+
+
+async def cache_items(redis_client: aioredis.Redis, game_id: int,
+                      found: Dict[str, Dict[str, str]], missed: Iterable[Any]):
+    await set_many(
+        redis_client,
+        {item_key(game_id, i): texts for i, texts in found.items()},
+        ttl=CACHE_TTL,
+        miss_keys=[item_key(game_id, i) for i in missed],
+        miss_value={},
+    )
+
+
+async def cache_text_in_all_languages(redis_client: aioredis.Redis, game_id: int, text: str,
+                                      found: Dict[str, List[Any]]):
+    """
+    Cache the result of a cross-language lookup; languages absent from found are cached as misses.
+    """
+    await set_many(
+        redis_client,
+        {text_key(game_id, lang, text): ids for lang, ids in found.items()},
+        ttl=CACHE_TTL,
+        miss_keys=[text_key(game_id, lang, text) for lang in CORE_LANGUAGES if lang not in found],
+        miss_value=[],
+    )
+
+
+async def apply_changes(redis_client: aioredis.Redis, game_id: int,
+                        localization_dict: Dict[Any, Dict[str, str]], changes: Dict[str, Dict[Any, Any]]):
+    """
+    Update only the keys affected by a refresh, given the change set from crud.insert_localization_data.
+
+    Changed items get their new blob, deleted items are removed, and every text
+    that was added or dropped gets its item_id list recomputed from the full new
+    data (or is removed when no item uses it anymore). Cached misses for new
+    texts and IDs are overwritten as a side effect.
+    """
+    item_values: Dict[str, Any] = {item_key(game_id, i): texts for i, texts in changes["inserted"].items()}
+    item_values.update({item_key(game_id, i): new for i, (_, new) in changes["updated"].items()})
+    stale_keys = [item_key(game_id, i) for i in changes["deleted"]]
+
+    # (lang, collation key) pairs whose item_id list may have changed
+    touched = set()
+    for texts in list(changes["inserted"].values()) + list(changes["deleted"].values()):
+        touched.update((lang, texts[f"{lang}_text"]) for lang in CORE_LANGUAGES)
+    for old, new in changes["updated"].values():
+        for lang in CORE_LANGUAGES:
+            column = f"{lang}_text"
+            if old[column] != new[column]:
+                touched.update({(lang, old[column]), (lang, new[column])})
+    touched = {(lang, fold(text)) for lang, text in touched if text}
+    if not item_values and not stale_keys and not touched:
+        return
+
+    text_ids: Dict[tuple, List[Any]] = {}
+    for item_id in sorted(localization_dict, key=item_id_sort_key):
+        translation = localization_dict[item_id]
+        for lang in CORE_LANGUAGES:
+            pair = (lang, fold(translation.get(lang) or ""))
+            if pair in touched:
+                text_ids.setdefault(pair, []).append(item_id)
+    text_values = {text_key(game_id, lang, key): ids for (lang, key), ids in text_ids.items()}
+    stale_keys += [text_key(game_id, lang, key) for lang, key in touched if (lang, key) not in text_ids]
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key, value in {**item_values, **text_values}.items():
+            pipe.set(key, json.dumps(value, ensure_ascii=False), ex=CACHE_TTL)
+        if stale_keys:
+            pipe.unlink(*stale_keys)
+        await pipe.execute()
+        logger.info(f"Updated {len(item_values) + len(text_values)} and removed {len(stale_keys)} "
+                    f"cached keys for game {game_id} in Redis.")
+    except RedisError as e:
+        logger.error(f"Error updating Redis cache for game {game_id}: {e}")
+
+
+# ------------------------------------------------------------------------
+# CHECKSUMS
+# ------------------------------------------------------------------------
+async def store_checksum(redis_client: aioredis.Redis, game: str, checksum: Dict[str, str], generated_at: float):
+    try:
+        await redis_client.hset(CHECKSUM_KEY, game, json.dumps({"checksum": checksum, "generated_at": generated_at}))
+    except RedisError as e:
+        logger.warning(f"Could not store the checksums of {game}: {e}")
+
+
+async def load_checksums(redis_client: aioredis.Redis) -> Dict[str, Tuple[Dict[str, str], float]]:
+    """
+    Every stored checksum document as game -> (checksum, generated_at); empty if Redis is unavailable.
+    """
+    try:
+        stored = await redis_client.hgetall(CHECKSUM_KEY)
+    except RedisError as e:
+        logger.warning(f"Could not read stored checksums: {e}")
+        return {}
+    documents = {}
+    for game, raw in stored.items():
+        document = json.loads(raw)
+        documents[game.decode()] = (document["checksum"], document["generated_at"])
+    return documents
@@ -0,0 +1,47 @@
+import unicodedata
+
+
+# ------------------------------------------------------------------------
+# COLLATION KEYS
+# ------------------------------------------------------------------------
+# i18n_dict uses utf8mb4_0900_ai_ci, so `text_column = :word` in MySQL ignores case,
+# accents (including kana voicing marks), character width and kana type. Every lookup
+# that answers without MySQL (the in-process index, snapshots, Redis) keys names by
+# fold(text) so it matches the same rows MySQL would.
+#
+# fold only approximates the collation: it covers the differences that occur in game
+# names (case, accents, width, hiragana/katakana, small kana). Characters the collation
+# expands or equates in other ways (e.g. "æ" = "ae") can still match in MySQL but not in
+# the index, or the other way round.
+#
+# Stored keys (snapshots, Redis) depend on fold; bump KEY_VERSION whenever it changes.
+KEY_VERSION = 2
+
+
+def _kana_table():
+    small = dict(zip("ぁぃぅぇぉっゃゅょゎゕゖ", "あいうえおつやゆよわかけ"))
+    table = {ord(s): n for s, n in small.items()}
+    # Katakana U+30A1..U+30F6 sit 0x60 above the matching hiragana
+    for code in range(0x30A1, 0x30F7):
+        hiragana = chr(code - 0x60)
+        table[code] = small.get(hiragana, hiragana)
+    return table
+
+
+_KANA = _kana_table()
+
+
+def fold(text: str) -> str:
+    """
+    Key under which two names compare equal, approximating utf8mb4_0900_ai_ci.
+
+    NFKD splits off accents and width/compatibility variants, the text is case
+    folded (and decomposed again, as folding can produce accented letters), then
+    combining marks are dropped and kana are mapped to full-size hiragana.
+    Trailing spaces stay significant (NO PAD).
+    fold(fold(text)) == fold(text), so keys can be passed back in.
+    """
+    if text.isascii():
+        return text.lower()
+    folded = unicodedata.normalize("NFKD", unicodedata.normalize("NFKD", text).casefold())
+    return "".join(c for c in folded if not unicodedata.combining(c)).translate(_KANA)
@@ -1,11 +1,12 @@
+from sqlalchemy import and_, bindparam, delete, insert, or_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, PendingRollbackError
-import json
-import redis
+from db.collation import fold
 from db.models import I18nDict
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 from base_logger import logger
-from api_config import game_name_id_map
+from api_config import CORE_LANGUAGES, game_name_id_map
 
 
 def get_game_id_by_name(this_game_name: str) -> Optional[int]:
@@ -34,91 +35,156 @@ def get_lang_column(lang: str):
     return mapper.get(lang)
 
 
-def clear_game_data(db: Session, game_id: int):
+def row_to_texts(row: I18nDict) -> Dict[str, str]:
     """
-    Delete old data from i18n_dict for a given game_id.
+    Serialize the text columns of a row, e.g. {"chs_text": ..., "en_text": ...}.
+    """
+    return {f"{lang}_text": getattr(row, f"{lang}_text") for lang in CORE_LANGUAGES}
+
 
-    Any error during deletion will trigger a rollback to clear the session state.
+def get_item_ids_by_texts(db: Session, game_id: int, lang: str, texts: List[str]) -> Dict[str, List[Any]]:
     """
-    try:
-        # Use synchronize_session=False for performance when deleting
-        db.query(I18nDict).filter(I18nDict.game_id == game_id).delete(synchronize_session=False)
-        db.commit()
-    except (SQLAlchemyError, PendingRollbackError) as e:
-        logger.error(f"Error clearing game data: {e}")
-        db.rollback()  # ensure the session is cleared of the failed transaction
-        raise RuntimeError(f"Error clearing game data: {e}")
+    Map the collation key (db.collation.fold) of each text found in the given language column to the item_ids using it.
+
+    MySQL matches case- and accent-insensitively, so a row may be stored as e.g. "Café"
+    for a requested "cafe"; keying by the collation key lets callers find it either way.
+    """
+    column_attr = get_lang_column(lang)
+    rows = (
+        db.query(column_attr, I18nDict.item_id)
+        .filter(I18nDict.game_id == game_id, column_attr.in_(texts))
+        .order_by(I18nDict.item_id)
+        .all()
+    )
+    text_to_ids: Dict[str, List[Any]] = {}
+    for text, item_id in rows:
+        if text:
+            text_to_ids.setdefault(fold(text), []).append(item_id)
+    return text_to_ids
+
+
+def get_items_by_ids(db: Session, game_id: int, item_ids: List[Any]) -> Dict[str, Dict[str, str]]:
+    """
+    Map str(item_id) to the texts of every requested item that exists.
+    """
+    rows = (
+        db.query(I18nDict)
+        .filter(I18nDict.game_id == game_id, I18nDict.item_id.in_(item_ids))
+        .all()
+    )
+    return {str(row.item_id): row_to_texts(row) for row in rows}
+
+
+def find_items_by_text(db: Session, game_id: int, word: str) -> List[I18nDict]:
+    """
+    Find every item of a game whose name equals word in any core language.
+    """
+    or_clauses = [
+        col == word
+        for lang_code in CORE_LANGUAGES
+        if (col := get_lang_column(lang_code)) is not None
+    ]
+    return (
+        db.query(I18nDict)
+        .filter(I18nDict.game_id == game_id, or_(*or_clauses))
+        .order_by(I18nDict.item_id)
+        .all()
+    )
 
 
-def insert_localization_data(db: Session, redis_client: redis.Redis, game_id: int,
-                             localization_dict: Dict[str, Dict[str, str]]):
+# Rows per executemany / DELETE ... IN batch when writing a refresh
+WRITE_CHUNK_SIZE = 500
+TEXT_COLUMNS = [f"{lang}_text" for lang in CORE_LANGUAGES]
+
+
+def _chunks(items: List[Any], size: int = WRITE_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _upsert_rows(db: Session, rows: List[Dict[str, Any]]):
     """
-    Insert data into i18n_dict.
+    Write rows with INSERT ... ON DUPLICATE KEY UPDATE on MySQL, in fixed-size executemany batches.
+
+    Other dialects (SQLite in the benchmarks) fall back to an INSERT for new
+    keys and an UPDATE for existing ones; rows carry an "exists" flag for that.
+    """
+    table = I18nDict.__table__
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in TEXT_COLUMNS})
+        for chunk in _chunks([{k: v for k, v in row.items() if k != "exists"} for row in rows]):
+            db.execute(stmt, chunk)
+        return
+
+    new_rows = [{k: v for k, v in row.items() if k != "exists"} for row in rows if not row["exists"]]
+    for chunk in _chunks(new_rows):
+        db.execute(insert(table), chunk)
+    update_stmt = (
+        update(table)
+        .where(and_(table.c.game_id == bindparam("b_game_id"), table.c.item_id == bindparam("b_item_id")))
+        .values({col: bindparam(col) for col in TEXT_COLUMNS})
+    )
+    changed_rows = [
+        {"b_game_id": row["game_id"], "b_item_id": row["item_id"], **{col: row[col] for col in TEXT_COLUMNS}}
+        for row in rows if row["exists"]
+    ]
+    for chunk in _chunks(changed_rows):
+        db.execute(update_stmt, chunk)
+
+
+def insert_localization_data(db: Session, game_id: int,
+                             localization_dict: Dict[Any, Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Bring the rows of game_id in i18n_dict in line with localization_dict, writing only what changed.
 
     The localization_dict should be of the form:
       { item_id: { 'en': 'some text', 'chs': '中文', ...}, ... }
 
-    This function first groups all entries into one transaction. If an error occurs,
-    it will rollback the entire transaction before raising an error. Once the SQL
-    operations succeed, the same data is cached in Redis.
+    The stored rows are compared with the fetched data and only new, changed and
+    vanished items are upserted or deleted, in batches of WRITE_CHUNK_SIZE. All
+    writes happen in a single transaction, so concurrent readers keep seeing the
+    previous data until the commit and a failure rolls back to it.
+
+    Returns the change set used to update the Redis cache:
+      {"inserted": {item_id: texts}, "updated": {item_id: (old_texts, new_texts)},
+       "deleted": {item_id: old_texts}}
+    where texts maps "{lang}_text" column names to values.
     """
-    # Prepare entries in memory.
-    i18n_entries = []
-    for item_id, translation in localization_dict.items():
-        entry = I18nDict(
-            game_id=game_id,
-            item_id=item_id,
-            chs_text=translation.get("chs", ""),
-            cht_text=translation.get("cht", ""),
-            de_text=translation.get("de", ""),
-            en_text=translation.get("en", ""),
-            es_text=translation.get("es", ""),
-            fr_text=translation.get("fr", ""),
-            id_text=translation.get("id", ""),
-            jp_text=translation.get("jp", ""),
-            kr_text=translation.get("kr", ""),
-            pt_text=translation.get("pt", ""),
-            ru_text=translation.get("ru", ""),
-            th_text=translation.get("th", ""),
-            vi_text=translation.get("vi", "")
-        )
-        i18n_entries.append(entry)
-
-    # Insert all entries in one transaction.
     try:
-        # Add all the entries and commit once.
-        db.add_all(i18n_entries)
+        stored = {
+            str(row.item_id): (row.item_id, row_to_texts(row))
+            for row in db.query(I18nDict).filter(I18nDict.game_id == game_id).all()
+        }
+
+        changes = {"inserted": {}, "updated": {}, "deleted": {}}
+        upserts = []
+        for item_id, translation in localization_dict.items():
+            texts = {f"{lang}_text": translation.get(lang, "") for lang in CORE_LANGUAGES}
+            old = stored.pop(str(item_id), None)
+            if old is None:
+                changes["inserted"][item_id] = texts
+            elif old[1] != texts:
+                changes["updated"][item_id] = (old[1], texts)
+            else:
+                continue
+            upserts.append({"game_id": game_id, "item_id": item_id, "exists": old is not None, **texts})
+        # Whatever is left in stored no longer exists upstream
+        changes["deleted"] = {item_id: texts for item_id, texts in stored.values()}
+
+        _upsert_rows(db, upserts)
+        for chunk in _chunks(list(changes["deleted"])):
+            db.execute(delete(I18nDict.__table__).where(
+                I18nDict.game_id == game_id, I18nDict.item_id.in_(chunk)
+            ))
         db.commit()
     except (SQLAlchemyError, PendingRollbackError) as e:
-        logger.error(f"Error inserting localization data: {e}")
-        db.rollback()  # reset the session state
-        raise RuntimeError(f"Error inserting localization data: {e}")
-
-    logger.info(f"Inserted {len(i18n_entries)} rows into i18n_dict, task finished.")
+        logger.error(f"Error writing localization data: {e}")
+        db.rollback()  # reset the session state, the previous rows stay in place
+        raise RuntimeError(f"Error writing localization data: {e}")
 
-    # Cache the inserted entries in Redis.
-    try:
-        pipe = redis_client.pipeline(transaction=False)
-        for entry in i18n_entries:
-            data_dict = {
-                "chs_text": entry.chs_text,
-                "cht_text": entry.cht_text,
-                "de_text": entry.de_text,
-                "en_text": entry.en_text,
-                "es_text": entry.es_text,
-                "fr_text": entry.fr_text,
-                "id_text": entry.id_text,
-                "jp_text": entry.jp_text,
-                "kr_text": entry.kr_text,
-                "pt_text": entry.pt_text,
-                "ru_text": entry.ru_text,
-                "th_text": entry.th_text,
-                "vi_text": entry.vi_text,
-            }
-            redis_key = f"uigf:game-{entry.game_id}:{entry.item_id}"
-            pipe.set(redis_key, json.dumps(data_dict, ensure_ascii=False))
-        pipe.execute()
-        logger.info("All inserted items have been cached in Redis.")
-    except Exception as e:
-        # Redis caching error should be logged; you can decide whether to propagate or ignore.
-        logger.error(f"Error caching data in Redis: {e}")
+    logger.info(
+        f"Game {game_id}: {len(changes['inserted'])} inserted, {len(changes['updated'])} updated, "
+        f"{len(changes['deleted'])} deleted, {len(localization_dict) - len(upserts)} unchanged rows in i18n_dict."
+    )
+    return changes
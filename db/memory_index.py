@@ -0,0 +1,177 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from api_config import CORE_LANGUAGES
+from base_logger import logger
+from db.collation import fold
+from db.models import I18nDict
+from db.snapshot import GameSnapshot
+
+
+# ------------------------------------------------------------------------
+# IN-PROCESS TRANSLATION INDEX
+# ------------------------------------------------------------------------
+class TranslationIndex:
+    """
+    Read-only lookup tables built from i18n_dict.
+
+    For each game and core language two dicts are kept:
+      text_to_id[game_id][lang][fold(text)] -> item_id
+      id_to_text[game_id][lang][str(item_id)] -> text
+    plus a cross-language inverted index used by /identify:
+      postings[game_id][fold(text)] -> [(item_id, [matched langs]), ...]
+
+    Names are keyed by their collation key (db.collation.fold), so lookups match
+    the rows MySQL's case- and accent-insensitive comparison would.
+
+    Games with a snapshot file are served from snapshots[game_id] (a mapped
+    GameSnapshot answering the same lookups) instead of these dicts.
+
+    An instance is never mutated after construction; a refresh builds a new
+    instance and swaps it in with swap_index().
+    """
+
+    def __init__(self,
+                 text_to_id: Optional[Dict[int, Dict[str, Dict[str, Any]]]] = None,
+                 id_to_text: Optional[Dict[int, Dict[str, Dict[str, str]]]] = None,
+                 postings: Optional[Dict[int, Dict[str, List[Tuple[Any, List[str]]]]]] = None,
+                 snapshots: Optional[Dict[int, GameSnapshot]] = None):
+        self.text_to_id = text_to_id or {}
+        self.id_to_text = id_to_text or {}
+        self.postings = postings or {}
+        self.snapshots = snapshots or {}
+
+    @classmethod
+    def build(cls, db: Session, game_ids: Optional[Iterable[int]] = None) -> "TranslationIndex":
+        """
+        Load every row of i18n_dict (or only the given games) into a new index.
+        """
+        query = db.query(I18nDict)
+        if game_ids is not None:
+            game_ids = list(game_ids)
+            query = query.filter(I18nDict.game_id.in_(game_ids))
+
+        text_to_id: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        id_to_text: Dict[int, Dict[str, Dict[str, str]]] = {}
+        postings: Dict[int, Dict[str, List[Tuple[Any, List[str]]]]] = {}
+        for game_id in game_ids or []:
+            text_to_id[game_id] = {lang: {} for lang in CORE_LANGUAGES}
+            id_to_text[game_id] = {lang: {} for lang in CORE_LANGUAGES}
+            postings[game_id] = {}
+
+        row_count = 0
+        for row in query.order_by(I18nDict.game_id, I18nDict.item_id).all():
+            if row.game_id not in text_to_id:
+                text_to_id[row.game_id] = {lang: {} for lang in CORE_LANGUAGES}
+                id_to_text[row.game_id] = {lang: {} for lang in CORE_LANGUAGES}
+                postings[row.game_id] = {}
+            game_text_to_id = text_to_id[row.game_id]
+            game_id_to_text = id_to_text[row.game_id]
+            game_postings = postings[row.game_id]
+            item_key = str(row.item_id)
+            # collation key -> languages it appears in for this row
+            row_keys: Dict[str, List[str]] = {}
+            for lang in CORE_LANGUAGES:
+                text = getattr(row, f"{lang}_text")
+                game_id_to_text[lang][item_key] = text
+                if text:
+                    key = fold(text)
+                    # Keep the first (lowest) item_id when a name is shared
+                    game_text_to_id[lang].setdefault(key, row.item_id)
+                    row_keys.setdefault(key, []).append(lang)
+            for key, langs in row_keys.items():
+                game_postings.setdefault(key, []).append((row.item_id, langs))
+            row_count += 1
+
+        logger.info(f"Built translation index from {row_count} rows for games {sorted(text_to_id)}")
+        return cls(text_to_id, id_to_text, postings)
+
+    def with_games(self, other: "TranslationIndex") -> "TranslationIndex":
+        """
+        Return a new index where the games present in `other` replace this index's copies.
+        """
+        replaced = set(other.text_to_id) | set(other.snapshots)
+
+        def kept(tables: Dict[int, Any]) -> Dict[int, Any]:
+            return {game_id: table for game_id, table in tables.items() if game_id not in replaced}
+
+        return TranslationIndex({**kept(self.text_to_id), **other.text_to_id},
+                                {**kept(self.id_to_text), **other.id_to_text},
+                                {**kept(self.postings), **other.postings},
+                                {**kept(self.snapshots), **other.snapshots})
+
+    def only(self, game_ids: Iterable[int]) -> "TranslationIndex":
+        """
+        Return a new index holding only the given games of this one.
+        """
+        game_ids = set(game_ids)
+
+        def kept(tables: Dict[int, Any]) -> Dict[int, Any]:
+            return {game_id: table for game_id, table in tables.items() if game_id in game_ids}
+
+        return TranslationIndex(kept(self.text_to_id), kept(self.id_to_text), kept(self.postings),
+                                kept(self.snapshots))
+
+    def has_game(self, game_id: int) -> bool:
+        return game_id in self.text_to_id or game_id in self.snapshots
+
+    def get_item_id(self, game_id: int, lang: str, text: str, default: Any = None) -> Any:
+        snapshot = self.snapshots.get(game_id)
+        if snapshot is not None:
+            return snapshot.get_item_id(lang, text, default)
+        return self.text_to_id.get(game_id, {}).get(lang, {}).get(fold(text), default)
+
+    def get_item_name(self, game_id: int, lang: str, item_id: Any, default: Any = None) -> Any:
+        snapshot = self.snapshots.get(game_id)
+        if snapshot is not None:
+            return snapshot.get_item_name(lang, item_id, default)
+        return self.id_to_text.get(game_id, {}).get(lang, {}).get(str(item_id), default)
+
+    def find_items(self, game_id: int, text: str) -> List[Tuple[Any, List[str]]]:
+        """
+        Every (item_id, matched core languages) whose name equals text (under the collation) in any language.
+        """
+        snapshot = self.snapshots.get(game_id)
+        if snapshot is not None:
+            return snapshot.find_items(text)
+        return self.postings.get(game_id, {}).get(fold(text), [])
+
+    def iter_entries(self, game_id: int) -> Iterable[Tuple[Any, str, str]]:
+        """
+        Every non-empty (item_id, lang, text) of a game, e.g. to build the search index.
+        """
+        snapshot = self.snapshots.get(game_id)
+        if snapshot is not None:
+            return snapshot.iter_entries()
+        id_to_text = self.id_to_text.get(game_id, {})
+        return (
+            (item_id, lang, id_to_text[lang][str(item_id)])
+            for items in self.postings.get(game_id, {}).values()
+            for item_id, langs in items
+            for lang in langs
+        )
+
+    def game_ids(self) -> List[int]:
+        return sorted(set(self.text_to_id) | set(self.snapshots))
+
+
+_current_index = TranslationIndex()
+_swap_lock = threading.Lock()
+
+
+def get_index() -> TranslationIndex:
+    return _current_index
+
+
+def swap_index(new_index: TranslationIndex, merge: bool = False):
+    """
+    Atomically publish a new index.
+
+    With merge=True only the games contained in new_index are replaced and the
+    other games keep serving from the current index.
+    """
+    global _current_index
+    with _swap_lock:
+        _current_index = _current_index.with_games(new_index) if merge else new_index
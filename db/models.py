@@ -14,8 +14,8 @@ class I18nDict(Base):
     """
     __tablename__ = "i18n_dict"
 
-    # auto increment primary key if you want
-    game_id = Column(Integer, index=True, nullable=False)
+    # (game_id, item_id) is the primary key in uigf_dict.sql; upserts rely on it
+    game_id = Column(Integer, index=True, nullable=False, primary_key=True)
     item_id = Column(String(255), index=True, nullable=False, primary_key=True)
 
     chs_text = Column(String(255), default="")
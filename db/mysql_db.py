@@ -1,13 +1,42 @@
+from typing import Any, Callable, TypeVar
+
+import anyio
+import anyio.to_thread
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from base_logger import logger
-from api_config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME
+from api_config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME, DB_POOL_SIZE, DB_MAX_OVERFLOW
 
 
 SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, pool_recycle=900)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, pool_recycle=900,
+                       pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 logger.info(f"MySQL connection established to {DB_HOST}/{DB_NAME}")
+
+# One worker thread per pooled connection, so offloaded queries never queue inside the pool
+db_limiter = anyio.CapacityLimiter(DB_POOL_SIZE + DB_MAX_OVERFLOW)
+
+T = TypeVar("T")
+
+
+async def run_in_session(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run fn(db, *args) with a fresh session on the bounded DB thread pool.
+
+    Use this from async routes so a slow query never blocks the event loop.
+    """
+    def _call():
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    return await anyio.to_thread.run_sync(_call, limiter=db_limiter)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, Any, Literal
-from api_config import ACCEPTED_LANGUAGES
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, Any, List, Literal, Union
+from api_config import ACCEPTED_LANGUAGES, BATCH_MAX_ITEMS, BATCH_MAX_TEXT_LENGTH
 
 
 # ------------------------------------------------------------------------
@@ -23,3 +23,28 @@ class TranslateResponse(BaseModel):
         if value is not None and isinstance(value, str):
             return value.replace("\\'", "'")
         return value
+
+
+class BatchTranslateItem(BaseModel):
+    type: Literal["reverse", "normal"]
+    lang: Literal[*ACCEPTED_LANGUAGES]
+    game: Literal["genshin", "starrail", "zzz"]
+    item_name: Optional[str] = Field(default=None, max_length=BATCH_MAX_TEXT_LENGTH)
+    item_id: Optional[Union[int, str]] = None
+
+    @model_validator(mode="after")
+    def check_lookup_field(self):
+        if self.type == "normal" and not self.item_name:
+            raise ValueError("item_name must be provided for a normal lookup")
+        if self.type == "reverse" and self.item_id in (None, ""):
+            raise ValueError("item_id must be provided for a reverse lookup")
+        return self
+
+
+class BatchTranslateRequest(BaseModel):
+    items: List[BatchTranslateItem] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class BatchTranslateResponse(BaseModel):
+    count: int
+    results: List[TranslateResponse]
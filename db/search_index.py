@@ -0,0 +1,146 @@
+import bisect
+import heapq
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from base_logger import logger
+
+
+# ------------------------------------------------------------------------
+# NORMALIZATION
+# ------------------------------------------------------------------------
+NGRAM_SIZE = 2
+# Score bands: an exact match always ranks first, prefix matches rank by how much
+# of the name they cover, fuzzy matches rank by n-gram similarity.
+EXACT_SCORE = 1.0
+PREFIX_BASE_SCORE = 0.75
+FUZZY_WEIGHT = 0.9
+
+
+def normalize(text: str) -> str:
+    """
+    Fold width, case, spacing and punctuation so that e.g. "「旷怨」" matches "旷怨"
+    and "Kamisato  AYAKA" matches "kamisato ayaka".
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return "".join(
+        ch for ch in text
+        if not unicodedata.category(ch).startswith(("P", "Z", "C"))
+    )
+
+
+def ngrams(text: str) -> List[str]:
+    padded = f"\x02{text}\x03"
+    return [padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)]
+
+
+# ------------------------------------------------------------------------
+# PER-GAME INDEX
+# ------------------------------------------------------------------------
+class GameSearchIndex:
+    """
+    Prefix and typo-tolerant search over every language of one game.
+
+    Names are deduplicated after normalization (proper names are often identical
+    across several languages). Each unique key keeps the (item_id, lang, text)
+    entries it came from, a sorted key list serves prefix lookups with bisect,
+    and an n-gram -> key postings map serves fuzzy lookups scored by the Dice
+    coefficient.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Any, str, str]]):
+        key_ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.sources: List[List[Tuple[Any, str, str]]] = []
+        for item_id, lang, text in entries:
+            key = normalize(text)
+            if not key:
+                continue
+            if key not in key_ids:
+                key_ids[key] = len(self.keys)
+                self.keys.append(key)
+                self.sources.append([])
+            self.sources[key_ids[key]].append((item_id, lang, text))
+
+        self.sorted_keys: List[Tuple[str, int]] = sorted((key, kid) for kid, key in enumerate(self.keys))
+        self.gram_counts: List[int] = []
+        postings: Dict[str, List[int]] = {}
+        for kid, key in enumerate(self.keys):
+            grams = set(ngrams(key))
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(kid)
+        self.postings = postings
+
+    def _prefix_scores(self, query: str, scores: Dict[int, float]):
+        sorted_keys = self.sorted_keys
+        # Walk the run of keys starting with `query` in place; a slice would copy the whole tail
+        for i in range(bisect.bisect_left(sorted_keys, (query, -1)), len(sorted_keys)):
+            key, kid = sorted_keys[i]
+            if not key.startswith(query):
+                break
+            score = EXACT_SCORE if key == query else PREFIX_BASE_SCORE + (1 - PREFIX_BASE_SCORE) * len(query) / len(key)
+            scores[kid] = max(scores.get(kid, 0.0), score)
+
+    def _fuzzy_scores(self, query: str, scores: Dict[int, float], min_score: float):
+        grams = set(ngrams(query))
+        overlap = Counter()
+        for gram in grams:
+            kids = self.postings.get(gram)
+            if kids:
+                overlap.update(kids)
+        for kid, common in overlap.items():
+            score = FUZZY_WEIGHT * 2 * common / (len(grams) + self.gram_counts[kid])
+            if score >= min_score and score > scores.get(kid, 0.0):
+                scores[kid] = score
+
+    def search(self, query: str, limit: int = 10, lang: Optional[str] = None,
+               min_score: float = 0.3) -> List[Dict[str, Any]]:
+        """
+        Return up to `limit` items ordered by score, each with its best matching name.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        scores: Dict[int, float] = {}
+        self._prefix_scores(query, scores)
+        self._fuzzy_scores(query, scores, min_score)
+
+        best: Dict[Any, Tuple[float, str, str]] = {}
+        for kid, score in scores.items():
+            for item_id, source_lang, text in self.sources[kid]:
+                if lang is not None and source_lang != lang:
+                    continue
+                if item_id not in best or score > best[item_id][0]:
+                    best[item_id] = (score, source_lang, text)
+
+        top = heapq.nlargest(limit, best.items(), key=lambda kv: kv[1][0])
+        return [
+            {"item_id": item_id, "score": round(score, 4), "lang": source_lang, "text": text}
+            for item_id, (score, source_lang, text) in top
+        ]
+
+
+# ------------------------------------------------------------------------
+# PUBLISHED INDEXES
+# ------------------------------------------------------------------------
+_current_indexes: Dict[int, GameSearchIndex] = {}
+_swap_lock = threading.Lock()
+
+
+def get_game_index(game_id: int) -> Optional[GameSearchIndex]:
+    return _current_indexes.get(game_id)
+
+
+def swap_game_indexes(new_indexes: Dict[int, GameSearchIndex]):
+    """
+    Atomically publish rebuilt indexes for the given games; other games are kept.
+    """
+    global _current_indexes
+    with _swap_lock:
+        _current_indexes = {**_current_indexes, **new_indexes}
+    for game_id, index in new_indexes.items():
+        logger.info(f"Search index for game {game_id}: {len(index.keys)} unique names, {len(index.postings)} n-grams")
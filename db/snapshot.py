@@ -0,0 +1,281 @@
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from api_config import CORE_LANGUAGES
+from db.collation import KEY_VERSION, fold
+from db.models import I18nDict
+
+
+# ------------------------------------------------------------------------
+# FILE LAYOUT
+# ------------------------------------------------------------------------
+# One immutable file per game, written next to its dictionaries at dict/{game}/index.snapshot.
+# Every section is an array of native-endian uint32 (BYTE_ORDER_MARK tells whether the
+# reading machine agrees), so it can be used straight from the mapped pages:
+#
+#   string_offsets  n_strings + 1   string s is string_data[offsets[s]:offsets[s + 1]] (UTF-8);
+#                                   string 0 stands for NULL
+#   string_data     bytes
+#   item_ids        n_items         string of each item_id, in i18n_dict order
+#   names           n_langs * n_items   string of each item's name, language-major
+#   posting_offsets n_strings + 1   postings of string s are entries posting_offsets[s]:[s + 1]
+#   posting_items   n_postings      item with a name whose collation key (db.collation.fold) is the string, ascending
+#   posting_langs   n_postings      bit i set if that name is in CORE_LANGUAGES[i]
+#   text_slots      text_capacity   open-addressing table of collation key strings (0 = empty)
+#   id_slots        id_capacity     open-addressing table of items by item_id (item + 1, 0 = empty)
+#
+# Both hash tables use CRC-32 of the UTF-8 bytes (stable across processes) and linear probing.
+# The header carries the content version the snapshot was built with: the MD5 of the game's all.json
+# published alongside it, so a reader can tell whether it missed a refresh.
+SNAPSHOT_FILE = "index.snapshot"
+FORMAT_VERSION = 3
+# Names are posted under collation keys, so a change of fold invalidates snapshots like a layout change does
+MAGIC = f"UIGF{FORMAT_VERSION:02d}{KEY_VERSION:02d}".encode("ascii")
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct("=8s32s8I9Q")
+SECTIONS = ["string_offsets", "string_data", "item_ids", "names", "posting_offsets",
+            "posting_items", "posting_langs", "text_slots", "id_slots"]
+
+
+def snapshot_path(game: str) -> str:
+    return os.path.join("dict", game, SNAPSHOT_FILE)
+
+
+def _table_capacity(count: int) -> int:
+    # Power of two, at most half full
+    capacity = 8
+    while capacity < count * 2:
+        capacity *= 2
+    return capacity
+
+
+def _insert(slots: array, key: bytes, value: int):
+    mask = len(slots) - 1
+    slot = zlib.crc32(key) & mask
+    while slots[slot]:
+        slot = (slot + 1) & mask
+    slots[slot] = value
+
+
+# ------------------------------------------------------------------------
+# WRITER
+# ------------------------------------------------------------------------
+def build_snapshot(db: Session, game_id: int, version: str = "") -> bytes:
+    """
+    Compile every i18n_dict row of a game into snapshot bytes, stamped with version.
+
+    Names are posted under their collation key and shared names resolve to the
+    first (lowest) item_id, like TranslationIndex.build.
+    """
+    strings: Dict[str, int] = {}
+    string_offsets = array("I", [0, 0])
+    string_data = bytearray()
+
+    def intern(text: str) -> int:
+        sid = strings.get(text)
+        if sid is None:
+            sid = strings[text] = len(string_offsets) - 1
+            string_data.extend(text.encode("utf-8"))
+            string_offsets.append(len(string_data))
+        return sid
+
+    item_ids = array("I")
+    names = {lang: array("I") for lang in CORE_LANGUAGES}
+    postings: Dict[int, List[Tuple[int, int]]] = {}
+    query = db.query(I18nDict).filter(I18nDict.game_id == game_id).order_by(I18nDict.item_id)
+    for item, row in enumerate(query.yield_per(5000)):
+        item_ids.append(intern(str(row.item_id)))
+        row_langs: Dict[int, int] = {}
+        for bit, lang in enumerate(CORE_LANGUAGES):
+            text = getattr(row, f"{lang}_text")
+            sid = 0 if text is None else intern(text)
+            names[lang].append(sid)
+            if text:
+                key = intern(fold(text))
+                row_langs[key] = row_langs.get(key, 0) | (1 << bit)
+        for sid, langs in row_langs.items():
+            postings.setdefault(sid, []).append((item, langs))
+
+    n_strings = len(string_offsets) - 1
+    posting_offsets = array("I", [0])
+    posting_items = array("I")
+    posting_langs = array("I")
+    for sid in range(n_strings):
+        for item, langs in postings.get(sid, ()):
+            posting_items.append(item)
+            posting_langs.append(langs)
+        posting_offsets.append(len(posting_items))
+
+    def string_bytes(sid: int) -> bytes:
+        return bytes(string_data[string_offsets[sid]:string_offsets[sid + 1]])
+
+    text_slots = array("I", bytes(4 * _table_capacity(len(postings))))
+    for sid in postings:
+        _insert(text_slots, string_bytes(sid), sid)
+    id_slots = array("I", bytes(4 * _table_capacity(len(item_ids))))
+    for item, sid in enumerate(item_ids):
+        _insert(id_slots, string_bytes(sid), item + 1)
+
+    names_section = array("I")
+    for lang in CORE_LANGUAGES:
+        names_section.extend(names[lang])
+    sections = [string_offsets.tobytes(), bytes(string_data), item_ids.tobytes(), names_section.tobytes(),
+                posting_offsets.tobytes(), posting_items.tobytes(), posting_langs.tobytes(),
+                text_slots.tobytes(), id_slots.tobytes()]
+
+    body = bytearray()
+    offsets = []
+    for section in sections:
+        body.extend(bytes(-(HEADER.size + len(body)) % 8))
+        offsets.append(HEADER.size + len(body))
+        body.extend(section)
+    header = HEADER.pack(MAGIC, version.encode("ascii"), BYTE_ORDER_MARK, game_id, len(item_ids), len(CORE_LANGUAGES), n_strings,
+                         len(posting_items), len(text_slots), len(id_slots),
+                         *offsets)
+    return header + bytes(body)
+
+
+# ------------------------------------------------------------------------
+# READER
+# ------------------------------------------------------------------------
+class GameSnapshot:
+    """
+    Read-only lookups served from a memory-mapped snapshot file.
+
+    The pages are shared by every process mapping the same file. A refresh
+    renames a new file into place and readers open a new GameSnapshot; the old
+    mapping stays valid until its last user drops it.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, byte_order, self.game_id, self.n_items, n_langs, self.n_strings,
+         n_postings, text_capacity, id_capacity, *offsets) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or byte_order != BYTE_ORDER_MARK or n_langs != len(CORE_LANGUAGES):
+            raise ValueError(f"{path} is not a compatible snapshot")
+        self.version = version.rstrip(b"\0").decode("ascii")
+
+        view = memoryview(self._mmap)
+        offsets = dict(zip(SECTIONS, offsets))
+
+        def section(name: str, count: int) -> memoryview:
+            return view[offsets[name]:offsets[name] + 4 * count].cast("I")
+
+        self._string_offsets = section("string_offsets", self.n_strings + 1)
+        self._string_data = view[offsets["string_data"]:offsets["string_data"] + self._string_offsets[-1]]
+        self._item_ids = section("item_ids", self.n_items)
+        self._names = section("names", n_langs * self.n_items)
+        self._posting_offsets = section("posting_offsets", self.n_strings + 1)
+        self._posting_items = section("posting_items", n_postings)
+        self._posting_langs = section("posting_langs", n_postings)
+        self._text_slots = section("text_slots", text_capacity)
+        self._id_slots = section("id_slots", id_capacity)
+        self._lang_bits = {lang: i for i, lang in enumerate(CORE_LANGUAGES)}
+        self.size = len(self._mmap)
+
+    # --------------------------------------------------------------------
+    def _bytes(self, sid: int) -> memoryview:
+        return self._string_data[self._string_offsets[sid]:self._string_offsets[sid + 1]]
+
+    def _text(self, sid: int) -> Optional[str]:
+        return None if sid == 0 else str(self._bytes(sid), "utf-8")
+
+    def _item_id(self, item: int) -> Any:
+        # item_id is a bigint column; return it as an int like the MySQL-built index does
+        item_id = self._text(self._item_ids[item])
+        return int(item_id) if item_id.isdigit() else item_id
+
+    def _find_string(self, text: str) -> int:
+        key = text.encode("utf-8")
+        slots = self._text_slots
+        mask = len(slots) - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            sid = slots[slot]
+            if sid == 0 or self._bytes(sid) == key:
+                return sid
+            slot = (slot + 1) & mask
+
+    def _find_item(self, item_id: Any) -> int:
+        key = str(item_id).encode("utf-8")
+        slots = self._id_slots
+        mask = len(slots) - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            item = slots[slot] - 1
+            if item < 0 or self._bytes(self._item_ids[item]) == key:
+                return item
+            slot = (slot + 1) & mask
+
+    # --------------------------------------------------------------------
+    def get_item_id(self, lang: str, text: str, default: Any = None) -> Any:
+        sid = self._find_string(fold(text)) if text and lang in self._lang_bits else 0
+        if not sid:
+            return default
+        bit = 1 << self._lang_bits[lang]
+        for p in range(self._posting_offsets[sid], self._posting_offsets[sid + 1]):
+            if self._posting_langs[p] & bit:
+                return self._item_id(self._posting_items[p])
+        return default
+
+    def get_item_name(self, lang: str, item_id: Any, default: Any = None) -> Any:
+        item = self._find_item(item_id)
+        if item < 0 or lang not in self._lang_bits:
+            return default
+        return self._text(self._names[self._lang_bits[lang] * self.n_items + item])
+
+    def find_items(self, text: str) -> List[Tuple[Any, List[str]]]:
+        sid = self._find_string(fold(text)) if text else 0
+        if not sid:
+            return []
+        return [
+            (self._item_id(self._posting_items[p]),
+             [lang for bit, lang in enumerate(CORE_LANGUAGES) if self._posting_langs[p] >> bit & 1])
+            for p in range(self._posting_offsets[sid], self._posting_offsets[sid + 1])
+        ]
+
+    def iter_entries(self) -> Iterator[Tuple[Any, str, str]]:
+        """
+        Every non-empty (item_id, lang, text), e.g. to build the search index.
+        """
+        for bit, lang in enumerate(CORE_LANGUAGES):
+            base = bit * self.n_items
+            for item in range(self.n_items):
+                sid = self._names[base + item]
+                if sid and self._string_offsets[sid + 1] > self._string_offsets[sid]:
+                    yield self._item_id(item), lang, self._text(sid)
+
+
+def read_version(path: str) -> Optional[str]:
+    """
+    The content version of the snapshot at path, or None if there is no snapshot this
+    code can map (e.g. one written before a layout change).
+    """
+    try:
+        with open(path, "rb") as f:
+            magic, version, byte_order, _, _, n_langs, *_ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or byte_order != BYTE_ORDER_MARK or n_langs != len(CORE_LANGUAGES):
+        return None
+    return version.rstrip(b"\0").decode("ascii")
+
+
+def is_compatible(path: str) -> bool:
+    return read_version(path) is not None
+
+
+def open_snapshot(path: str) -> Optional[GameSnapshot]:
+    """
+    Map the snapshot at path, or return None if there is none.
+    """
+    if not os.path.exists(path):
+        return None
+    return GameSnapshot(path)
@@ -0,0 +1,378 @@
+import email.utils
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import msgpack
+
+from base_logger import logger
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is always available
+    zstandard = None
+
+
+# ------------------------------------------------------------------------
+# PRE-COMPRESSED VARIANTS
+# ------------------------------------------------------------------------
+# (Content-Encoding token, file suffix), in server preference order
+ENCODINGS: List[Tuple[str, str]] = []
+if brotli is not None:
+    ENCODINGS.append(("br", ".br"))
+if zstandard is not None:
+    ENCODINGS.append(("zstd", ".zst"))
+ENCODINGS.append(("gzip", ".gz"))
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize a dictionary artifact as minified UTF-8 JSON.
+    """
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def atomic_write(path: str, data: bytes):
+    """
+    Write to a temporary file next to path and rename it into place, so readers
+    see either the old or the new file but never a partial one.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_artifact(path: str, data: bytes) -> str:
+    """
+    Write data to path, plus one pre-compressed copy per entry in ENCODINGS, and return its MD5.
+
+    All variants decompress to exactly the bytes of the plain file, so the MD5
+    published by /md5 holds whichever encoding a client downloads. The plain
+    file is written last.
+    """
+    for encoding, suffix in ENCODINGS:
+        atomic_write(path + suffix, _compress(encoding, data))
+    atomic_write(path, data)
+    logger.debug(f"Wrote {path} ({len(data)} bytes) with {[e for e, _ in ENCODINGS]} variants")
+    return hashlib.md5(data).hexdigest()
+
+
+def write_json_artifact(path: str, obj: Any) -> str:
+    return write_artifact(path, dumps(obj))
+
+
+def file_md5(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    MD5 of a file, read in chunks rather than all at once.
+    """
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Checksum documents of the files in a game directory, {lang: MD5}: the JSON
+# dictionaries (served by /md5/{game}) and the binary ones (/md5/{game}/msgpack)
+CHECKSUM_FILE = "md5.json"
+BINARY_CHECKSUM_FILE = "md5.msgpack.json"
+
+
+def _publish_order(name: str) -> Tuple[bool, bool]:
+    return name in (CHECKSUM_FILE, BINARY_CHECKSUM_FILE), name.endswith((".json", ".msgpack"))
+
+
+@contextmanager
+def staged_game_dir(game: str) -> Iterator[str]:
+    """
+    Yield an empty staging directory for a game's dictionary files.
+
+    On success every staged file is renamed into dict/{game} (compressed variants
+    first, then plain files, the checksum document last); on failure the staging
+    directory is discarded and the published files are left untouched.
+    """
+    game_dir = os.path.join("dict", game)
+    os.makedirs(game_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir="dict", prefix=f".staging-{game}-")
+    try:
+        yield staging
+        names = sorted(os.listdir(staging), key=_publish_order)
+        for name in names:
+            os.replace(os.path.join(staging, name), os.path.join(game_dir, name))
+        logger.info(f"Published {len(names)} dictionary files for {game}")
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+# Present while MySQL may hold changes of a game that are not yet published in dict/{game}
+PUBLISH_PENDING_FILE = ".publish-pending"
+
+
+def mark_publish_pending(game: str):
+    """
+    Record, before MySQL is written, that dict/{game} may stop matching the database.
+    """
+    game_dir = os.path.join("dict", game)
+    os.makedirs(game_dir, exist_ok=True)
+    atomic_write(os.path.join(game_dir, PUBLISH_PENDING_FILE), b"")
+
+
+def is_publish_pending(game: str) -> bool:
+    return os.path.exists(os.path.join("dict", game, PUBLISH_PENDING_FILE))
+
+
+def clear_publish_pending(game: str):
+    """
+    Record that dict/{game} matches the database again, e.g. after staged_game_dir published it.
+    """
+    try:
+        os.remove(os.path.join("dict", game, PUBLISH_PENDING_FILE))
+    except FileNotFoundError:
+        pass
+
+
+# ------------------------------------------------------------------------
+# BINARY (MSGPACK) FORMAT
+# ------------------------------------------------------------------------
+BINARY_FORMAT = "uigf-dict"
+BINARY_VERSION = 1
+
+
+def pack_columnar(game: str, item_ids: List[Any], names: Dict[str, List[str]]) -> bytes:
+    """
+    Pack a columnar dictionary: one shared item_ids array and, per language, a
+    string table aligned with it ("" where the item has no name). See the
+    "Binary Dictionary Format" section of README.md.
+    """
+    return msgpack.packb({
+        "format": BINARY_FORMAT,
+        "version": BINARY_VERSION,
+        "game": game,
+        "item_ids": item_ids,
+        "names": names,
+    }, use_bin_type=True)
+
+
+def unpack_columnar(data: bytes) -> Dict[str, Dict[str, Any]]:
+    """
+    Decode a columnar dictionary back into {lang: {text: item_id}}, the shape of the JSON files.
+    """
+    doc = msgpack.unpackb(data, raw=False)
+    if doc.get("format") != BINARY_FORMAT or doc.get("version") != BINARY_VERSION:
+        raise ValueError("Not a UIGF binary dictionary of a supported version")
+    item_ids = doc["item_ids"]
+    return {
+        lang: {text: item_id for item_id, text in zip(item_ids, texts) if text}
+        for lang, texts in doc["names"].items()
+    }
+
+
+# ------------------------------------------------------------------------
+# CONTENT NEGOTIATION
+# ------------------------------------------------------------------------
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into {coding: q}.
+    """
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: Optional[str], path: str) -> Optional[Tuple[str, str]]:
+    """
+    Pick the best pre-compressed variant of path the client accepts.
+
+    Returns (Content-Encoding token, variant path), or None to serve the plain file.
+    """
+    if not accept_encoding:
+        return None
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best = None
+    best_q = 0.0
+    for encoding, suffix in ENCODINGS:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q and os.path.exists(path + suffix):
+            best, best_q = (encoding, path + suffix), q
+    return best
+
+
+# ------------------------------------------------------------------------
+# CONDITIONAL REQUESTS
+# ------------------------------------------------------------------------
+def make_etag(checksum: str, encoding: Optional[str] = None) -> str:
+    """
+    Strong ETag for one representation: the MD5 of the plain file, suffixed by the content coding.
+    """
+    return f'"{checksum}-{encoding}"' if encoding else f'"{checksum}"'
+
+
+_checksum_documents: Dict[str, Tuple[Tuple[int, int, int], Dict[str, str]]] = {}
+
+
+def read_checksum_document(path: str) -> Optional[Tuple[os.stat_result, Dict[str, str]]]:
+    """
+    The checksum document at path with its stat, or None if there is none.
+
+    The parsed document is kept per process and read again only when the file was replaced.
+    """
+    try:
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            cached = _checksum_documents.get(path)
+            if cached is None or cached[0] != stamp:
+                cached = _checksum_documents[path] = (stamp, json.load(f))
+    except (OSError, ValueError):
+        return None
+    return stat, cached[1]
+
+
+def published_checksum(file_path: str, key: str, document: str = CHECKSUM_FILE) -> Optional[str]:
+    """
+    MD5 of file_path as recorded under key in the checksum document next to it.
+
+    Every process reads the document from disk, so all of them agree with the
+    bytes on disk. A refresh renames the document last, and files written after
+    it are newer than it: until the new document lands, such a file has no known
+    checksum and None is returned.
+    """
+    published = read_checksum_document(os.path.join(os.path.dirname(file_path), document))
+    if published is None:
+        return None
+    stat, checksum = published
+    try:
+        if os.stat(file_path).st_mtime_ns > stat.st_mtime_ns:
+            return None
+    except OSError:
+        return None
+    return checksum.get(key)
+
+
+def format_http_date(timestamp: float) -> str:
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+def etag_matches(if_none_match: str, checksum: str) -> bool:
+    """
+    Weak comparison as required for If-None-Match. The coding suffix is ignored:
+    every encoding of a file carries the same content, so any of them is still fresh.
+    """
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"').split("-", 1)[0] == checksum:
+            return True
+    return False
+
+
+def is_not_modified(request_headers: Mapping[str, str], checksum: Optional[str],
+                    last_modified: Optional[float]) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when no If-None-Match was sent.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return checksum is not None and etag_matches(if_none_match, checksum)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+# ------------------------------------------------------------------------
+# GENERATION HISTORY AND DIFFS
+# ------------------------------------------------------------------------
+def history_path(game: str, lang: str, checksum: str = "") -> str:
+    base = os.path.join("dict", game, "history", lang)
+    return os.path.join(base, f"{checksum}.json") if checksum else base
+
+
+def archive_generation(game: str, lang: str, checksum: str, depth: int):
+    """
+    Keep a copy of dict/{game}/{lang}.json under its checksum and drop all but the newest `depth` copies.
+    """
+    lang_history = history_path(game, lang)
+    os.makedirs(lang_history, exist_ok=True)
+    target = history_path(game, lang, checksum)
+    if not os.path.exists(target):
+        shutil.copyfile(os.path.join("dict", game, f"{lang}.json"), target)
+    else:
+        os.utime(target)
+
+    generations = sorted(
+        (entry for entry in os.scandir(lang_history) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in generations[depth:]:
+        os.remove(entry.path)
+
+
+def has_generation(game: str, lang: str, checksum: str) -> bool:
+    # Checksums are hex digests; refuse anything else so `since` cannot escape the directory
+    return checksum.isalnum() and os.path.exists(history_path(game, lang, checksum))
+
+
+def load_generation(game: str, lang: str, checksum: str) -> Optional[Dict[str, Any]]:
+    if not has_generation(game, lang, checksum):
+        return None
+    with open(history_path(game, lang, checksum), "rb") as f:
+        return json.load(f)
+
+
+def diff_dicts(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Entries to apply to old to obtain new: added and changed {text: item_id}, removed [text].
+    """
+    return {
+        "added": {text: item_id for text, item_id in new.items() if text not in old},
+        "changed": {text: item_id for text, item_id in new.items() if text in old and old[text] != item_id},
+        "removed": [text for text in old if text not in new],
+    }
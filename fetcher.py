@@ -1,10 +1,28 @@
+import asyncio
+import codecs
 import httpx
-import io
 import json
+import multiprocessing
 import os
+import random
+import re
+import tempfile
+import time
+import urllib.parse
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, NamedTuple
+import dict_store
+from api_config import (CACHE_DIR, CORE_LANGUAGES, FETCH_BACKOFF, FETCH_CONCURRENCY, FETCH_RETRIES,
+                        FETCH_TIMEOUT, PARSE_WORKERS, STARRAIL_DATA_URL, ZZZ_DATA_URL)
 from base_logger import logger
 
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 
 DEPRECATED_GENSHIN_ID = {
     11506: "磐岩结绿",
@@ -30,6 +48,7 @@ GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
 SNAP_METADATA_LANGS = ["CHS", "CHT", "DE", "EN", "ES", "FR", "ID", "IT", "JP", "KR", "PT", "RU", "TH", "TR", "VI"]
 SNAP_METADATA_ZIP_URL = "https://github.com/DGP-Studio/Snap.Metadata/archive/refs/heads/main.zip"
+SNAP_METADATA_COMMIT_URL = "https://api.github.com/repos/DGP-Studio/Snap.Metadata/commits/main"
 SNAP_METADATA_ZIP_PREFIX = "Snap.Metadata-main"  # Folder name inside the zip
 
 
@@ -43,13 +62,46 @@ def _read_json_from_zip(zf: zipfile.ZipFile, path: str) -> dict | list | None:
         return None
 
 
-def fetch_genshin_impact_update():
+def _extract_genshin_language(zip_path: str, lang: str, avatar_ids: list[str]) -> dict[int, str]:
+    """
+    Collect {item_id: name} of one language from the weapon list and the avatar files.
+
+    Runs in a worker process, which opens the ZIP itself and reads only this language's members.
+    """
+    this_lang_id_to_name: dict[int, str] = {}
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        # Read Weapon.json
+        weapon_path = f"{SNAP_METADATA_ZIP_PREFIX}/Genshin/{lang}/Weapon.json"
+        weapon_data = _read_json_from_zip(zf, weapon_path)
+        if weapon_data:
+            for weapon in weapon_data:
+                weapon_name = weapon.get("Name", "")
+                weapon_id = weapon.get("Id", 0)
+                if weapon_name and weapon_id:
+                    this_lang_id_to_name[weapon_id] = weapon_name
+
+        # Read each Avatar file
+        for avatar_id in avatar_ids:
+            avatar_path = f"{SNAP_METADATA_ZIP_PREFIX}/Genshin/{lang}/Avatar/{avatar_id}.json"
+            avatar_data = _read_json_from_zip(zf, avatar_path)
+            if avatar_data:
+                avatar_name = avatar_data.get("Name", "")
+                avatar_id_int = avatar_data.get("Id", 0)
+                if avatar_name and avatar_id_int:
+                    this_lang_id_to_name[avatar_id_int] = avatar_name
+
+    logger.debug(f"Processed {lang}: {len(this_lang_id_to_name)} items")
+    return this_lang_id_to_name
+
+
+def fetch_genshin_impact_update(force: bool = False):
     """
     Fetch Genshin Impact item data from Snap.Metadata.
     
     Optimization strategy:
-    - Download the entire repository as a ZIP file (1 HTTP request)
-    - Extract and process files in memory
+    - Compare the latest commit with the one the cached ZIP was downloaded at (1 small request)
+    - Download the entire repository as a ZIP file only when it moved (1 HTTP request)
+    - Extract and process files from the cached ZIP on disk, one worker process per language
     
     This reduces ~1600+ HTTP requests to just 1 request + local I/O operations.
     """
@@ -58,19 +110,23 @@ def fetch_genshin_impact_update():
     
     headers = {"Authorization": f"Bearer {GITHUB_TOKEN}"}
     
-    # Step 1: Download the repository ZIP file
-    logger.info("Downloading Snap.Metadata repository ZIP...")
-    with httpx.Client(headers=headers, timeout=120.0, follow_redirects=True) as client:
-        resp = client.get(SNAP_METADATA_ZIP_URL)
+    # Step 1: Download the repository ZIP file unless the cached one is at the latest commit
+    with httpx.Client(headers=headers, timeout=30.0, follow_redirects=True) as client:
+        resp = client.get(SNAP_METADATA_COMMIT_URL, headers={"Accept": "application/vnd.github.sha"})
         resp.raise_for_status()
-        zip_data = resp.content
-    
-    logger.info(f"Downloaded ZIP file: {len(zip_data) / 1024 / 1024:.2f} MB")
+        commit = resp.text.strip()
+    zip_path = cache_path(SNAP_METADATA_ZIP_URL)
+    if not force and not has_pending_meta(zip_path) and load_cache_meta(zip_path).get("commit") == commit:
+        raise UpstreamNotModified(f"Snap.Metadata is still at commit {commit}")
+
+    logger.info(f"Downloading Snap.Metadata repository ZIP at commit {commit}...")
+    fetch_files("", {"zip": SNAP_METADATA_ZIP_URL}, force=True, headers=headers)
+    stage_cache_meta("genshin", zip_path, {**load_cache_meta(zip_path, PENDING_META_SUFFIX), "commit": commit})
     
-    # Step 2: Open ZIP in memory and extract data
-    id_to_name: dict[str, dict[int, str]] = {}
+    logger.info(f"Downloaded ZIP file: {os.path.getsize(zip_path) / 1024 / 1024:.2f} MB")
     
-    with zipfile.ZipFile(io.BytesIO(zip_data), 'r') as zf:
+    # Step 2: Read the avatar IDs, then extract every language in parallel from the ZIP on disk
+    with zipfile.ZipFile(zip_path, 'r') as zf:
         # Get avatar IDs from CHS Meta.json
         meta_path = f"{SNAP_METADATA_ZIP_PREFIX}/Genshin/CHS/Meta.json"
         meta_data = _read_json_from_zip(zf, meta_path)
@@ -84,33 +140,16 @@ def fetch_genshin_impact_update():
             if key.startswith("Avatar/")
         ]
         logger.info(f"Found {len(avatar_ids)} avatar IDs from Meta.json")
-        
-        # Process each language
-        for lang in SNAP_METADATA_LANGS:
-            this_lang_id_to_name: dict[int, str] = {}
-            
-            # Read Weapon.json
-            weapon_path = f"{SNAP_METADATA_ZIP_PREFIX}/Genshin/{lang}/Weapon.json"
-            weapon_data = _read_json_from_zip(zf, weapon_path)
-            if weapon_data:
-                for weapon in weapon_data:
-                    weapon_name = weapon.get("Name", "")
-                    weapon_id = weapon.get("Id", 0)
-                    if weapon_name and weapon_id:
-                        this_lang_id_to_name[weapon_id] = weapon_name
-            
-            # Read each Avatar file
-            for avatar_id in avatar_ids:
-                avatar_path = f"{SNAP_METADATA_ZIP_PREFIX}/Genshin/{lang}/Avatar/{avatar_id}.json"
-                avatar_data = _read_json_from_zip(zf, avatar_path)
-                if avatar_data:
-                    avatar_name = avatar_data.get("Name", "")
-                    avatar_id_int = avatar_data.get("Id", 0)
-                    if avatar_name and avatar_id_int:
-                        this_lang_id_to_name[avatar_id_int] = avatar_name
-            
-            id_to_name[lang] = this_lang_id_to_name
-            logger.debug(f"Processed {lang}: {len(this_lang_id_to_name)} items")
+    
+    id_to_name: dict[str, dict[int, str]] = dict(zip(
+        SNAP_METADATA_LANGS,
+        map_in_processes(
+            _extract_genshin_language,
+            [zip_path] * len(SNAP_METADATA_LANGS),
+            SNAP_METADATA_LANGS,
+            [avatar_ids] * len(SNAP_METADATA_LANGS),
+        ),
+    ))
     
     # Step 3: Build response
     all_item_ids = id_to_name["CHS"].keys()
@@ -131,37 +170,387 @@ def fetch_genshin_impact_update():
     return resp
 
 
-def fetch_starrail_update():
-    target_host = "https://gitlab.com/Dimbreath/turnbasedgamedata/-/raw/main/"
+# ------------------------------------------------------------------------
+# UPSTREAM CACHE
+# ------------------------------------------------------------------------
+# Every downloaded file is kept at CACHE_DIR/{host}/{path} next to a .meta.json
+# holding its ETag/Last-Modified, which are sent back as conditional headers on
+# the next refresh. A 304 reuses the cached copy without downloading it again.
+#
+# A new download only stages its validators in .meta.pending.json; they become the
+# .meta.json once its game has been loaded and published (commit_cache_meta). Until
+# then the file is requested unconditionally, so a refresh that fails after the
+# download is repeated in full instead of being skipped as "not modified".
+class UpstreamNotModified(Exception):
+    """
+    Raised by the fetch_* functions when every upstream file still matches its cached copy.
+    """
+
+
+class CachedFile(NamedTuple):
+    path: str
+    modified: bool
+
+
+def cache_path(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    segments = [segment for segment in parts.path.split("/") if segment not in ("", ".", "..")]
+    return os.path.join(CACHE_DIR, parts.netloc.replace(":", "_"), *segments)
+
+
+PENDING_META_SUFFIX = ".meta.pending.json"
+# Cached paths with staged validators, by game, waiting for commit_cache_meta
+_pending_meta: dict[str, set[str]] = {}
+
+
+def load_cache_meta(path: str, suffix: str = ".meta.json") -> dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path + suffix, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache_meta(path: str, meta: dict[str, Any], suffix: str = ".meta.json"):
+    dict_store.atomic_write(path + suffix, json.dumps(meta, indent=2).encode("utf-8"))
+
+
+def stage_cache_meta(game: str, path: str, meta: dict[str, Any]):
+    save_cache_meta(path, meta, PENDING_META_SUFFIX)
+    _pending_meta.setdefault(game, set()).add(path)
+
+
+def has_pending_meta(path: str) -> bool:
+    return os.path.exists(path + PENDING_META_SUFFIX)
+
+
+def commit_cache_meta(game: str):
+    """
+    Make the validators staged by the downloads of game current, once its data has been loaded and published.
+    """
+    for path in _pending_meta.pop(game, ()):
+        if has_pending_meta(path):
+            os.replace(path + PENDING_META_SUFFIX, path + ".meta.json")
+
+
+def _conditional_headers(path: str) -> dict[str, str]:
+    if has_pending_meta(path):
+        return {}
+    meta = load_cache_meta(path)
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+# ------------------------------------------------------------------------
+# CONCURRENT DOWNLOADS
+# ------------------------------------------------------------------------
+def _is_retryable(error: httpx.HTTPError) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+async def _save_response(resp: httpx.Response, path: str) -> int:
+    """
+    Stream the body into a temporary file and rename it over the cached copy, then stage its validators.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in resp.aiter_bytes():
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    save_cache_meta(path, {
+        "url": str(resp.request.url),
+        "etag": resp.headers.get("etag"),
+        "last_modified": resp.headers.get("last-modified"),
+    }, PENDING_META_SUFFIX)
+    return size
+
+
+async def _download(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str,
+                    force: bool) -> tuple[CachedFile, int]:
+    """
+    Refresh the cached copy of url and return it with the number of bytes received.
+
+    Unless force is set, the request is conditional on the cached validators.
+    Up to FETCH_RETRIES attempts are made, backing off exponentially (with jitter)
+    on connection errors, timeouts, 429 and 5xx responses.
+    """
+    path = cache_path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for attempt in range(1, FETCH_RETRIES + 1):
+        headers = {} if force else _conditional_headers(path)
+        try:
+            async with semaphore:
+                async with client.stream("GET", url, headers=headers) as resp:
+                    if resp.status_code == 304:
+                        return CachedFile(path, False), 0
+                    resp.raise_for_status()
+                    size = await _save_response(resp, path)
+            return CachedFile(path, True), size
+        except httpx.HTTPError as e:
+            if attempt == FETCH_RETRIES or not _is_retryable(e):
+                raise
+            delay = FETCH_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.8, 1.2)
+            logger.warning(f"Download of {url} failed ({e!r}), retry {attempt}/{FETCH_RETRIES - 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def download_files(base_url: str, files: dict[str, str], force: bool = False,
+                         headers: dict[str, str] | None = None) -> dict[str, CachedFile]:
+    """
+    Refresh the cached copies of {name: path relative to base_url} concurrently over one pooled client.
+
+    At most FETCH_CONCURRENCY requests are in flight; the first file that still
+    fails after its retries aborts the whole batch.
+    """
+    limits = httpx.Limits(max_connections=FETCH_CONCURRENCY, max_keepalive_connections=FETCH_CONCURRENCY)
+    timeout = httpx.Timeout(FETCH_TIMEOUT, connect=10.0)
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+    start_time = time.perf_counter()
+    done = 0
+    total_bytes = 0
+
+    async def download(name: str, client: httpx.AsyncClient) -> tuple[str, CachedFile]:
+        nonlocal done, total_bytes
+        cached, size = await _download(client, semaphore, base_url + files[name], force)
+        done += 1
+        total_bytes += size
+        if cached.modified:
+            logger.info(f"[{done}/{len(files)}] Downloaded {files[name]} ({size / 1024 / 1024:.2f} MB)")
+        else:
+            logger.info(f"[{done}/{len(files)}] {files[name]} not modified, using cached copy")
+        return name, cached
+
+    async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=limits, timeout=timeout, headers=headers,
+                                 follow_redirects=True) as client:
+        results = await asyncio.gather(*(download(name, client) for name in files))
+
+    modified = sum(cached.modified for _, cached in results)
+    logger.info(f"Checked {len(files)} files from {base_url} in {time.perf_counter() - start_time:.1f}s: "
+                f"{modified} downloaded ({total_bytes / 1024 / 1024:.2f} MB), {len(files) - modified} not modified")
+    return dict(results)
+
+
+def fetch_files(base_url: str, files: dict[str, str], force: bool = False,
+                headers: dict[str, str] | None = None) -> dict[str, CachedFile]:
+    """
+    Blocking wrapper around download_files.
+
+    The fetch_* functions run in a worker thread, so they drive their own event loop.
+    """
+    return asyncio.run(download_files(base_url, files, force, headers))
+
+
+def read_json(path: str) -> dict | list:
+    with open(path, "rb") as f:
+        return json.load(f)
+
+
+def read_textmap(path: str, wanted: set[str], chunk_size: int = 1024 * 1024) -> dict[str, Any]:
+    """
+    Parse a cached TextMap chunk by chunk, keeping only the wanted keys.
+    """
+    textmap = TextMapFilter(wanted)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            textmap.feed(chunk)
+    return textmap.result()
+
+
+def map_in_processes(fn: Callable, *iterables: list) -> list:
+    """
+    list(map(fn, *iterables)) spread over up to PARSE_WORKERS processes.
+
+    Workers are spawned rather than forked, since the API process runs threads
+    (event loop, DB pool, uvicorn) whose locks a forked child would inherit.
+    fn must be a module-level function so it can be pickled.
+    """
+    workers = min(PARSE_WORKERS, len(iterables[0]))
+    if workers <= 1:
+        return list(map(fn, *iterables))
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(fn, *iterables))
+    logger.info(f"Ran {len(results)} {fn.__name__} jobs on {workers} processes "
+                f"in {time.perf_counter() - start_time:.1f}s")
+    return results
+
+
+# ------------------------------------------------------------------------
+# STREAMING TEXTMAP PARSER
+# ------------------------------------------------------------------------
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_WHITESPACE_CHARS = " \t\n\r"
+_VALUE_TERMINATORS = frozenset(",} \t\n\r")
+_scanstring = json.decoder.scanstring
+_BEFORE_OBJECT, _IN_OBJECT, _AFTER_OBJECT = range(3)
+
+
+class TextMapFilter:
+    """
+    Incremental parser for a flat JSON object that keeps only the wanted keys.
+
+    A TextMap is a single {key: text} object of tens of MB, of which only a few
+    hundred entries are needed. Chunks are parsed as they are read and entries are
+    consumed whole: an entry cut by a chunk boundary stays in the buffer until the
+    next chunk completes it, so memory is bounded by one chunk plus the matches.
+    Strings are decoded with the json module's C scanner.
+    """
+
+    def __init__(self, wanted: set[str]):
+        self.wanted = wanted
+        self.entries: dict[str, Any] = {}
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._state = _BEFORE_OBJECT
+        self._after_entry = False
+
+    def feed(self, chunk: bytes, final: bool = False):
+        self._buffer += self._utf8.decode(chunk, final)
+        pos = self._parse(final)
+        self._buffer = self._buffer[pos:]
+
+    def result(self) -> dict[str, Any]:
+        self.feed(b"", final=True)
+        if self._state != _AFTER_OBJECT:
+            raise ValueError("TextMap ended before its closing brace")
+        return self.entries
+
+    def _parse(self, final: bool) -> int:
+        """
+        Consume as many complete entries as the buffer holds and return the position parsed up to.
+        """
+        buf = self._buffer
+        wanted = self.wanted
+        entries = self.entries
+        after_entry = self._after_entry
+        pos = start = 0
+        try:
+            if self._state == _BEFORE_OBJECT:
+                pos = _WHITESPACE.match(buf, pos).end()
+                if buf[pos] != "{":
+                    raise ValueError(f"TextMap is not a JSON object (starts with {buf[pos]!r})")
+                pos += 1
+                self._state = _IN_OBJECT
+
+            while self._state == _IN_OBJECT:
+                # An iteration consumes one whole entry, or the closing brace
+                start = pos
+                ch = buf[pos]
+                if ch in _WHITESPACE_CHARS:
+                    pos = _WHITESPACE.match(buf, pos).end()
+                    ch = buf[pos]
+                if ch == "}":
+                    self._state = _AFTER_OBJECT
+                    pos += 1
+                    break
+                if after_entry:
+                    if ch != ",":
+                        raise ValueError(f"Expected ',' between TextMap entries, found {ch!r}")
+                    pos += 1
+                    ch = buf[pos]
+                    if ch in _WHITESPACE_CHARS:
+                        pos = _WHITESPACE.match(buf, pos).end()
+                        ch = buf[pos]
+                if ch != '"':
+                    raise ValueError(f"Expected a TextMap key, found {ch!r}")
+                key, pos = _scanstring(buf, pos + 1)
+                ch = buf[pos]
+                if ch in _WHITESPACE_CHARS:
+                    pos = _WHITESPACE.match(buf, pos).end()
+                    ch = buf[pos]
+                if ch != ":":
+                    raise ValueError(f"Expected ':' after TextMap key {key!r}")
+                pos += 1
+                ch = buf[pos]
+                if ch in _WHITESPACE_CHARS:
+                    pos = _WHITESPACE.match(buf, pos).end()
+                    ch = buf[pos]
+                if ch == '"':
+                    value, pos = _scanstring(buf, pos + 1)
+                else:
+                    value, pos = self._json.raw_decode(buf, pos)
+                    # A number cut by the chunk boundary ("12" of "12.5") parses fine; wait for its end
+                    if not final and (pos == len(buf) or buf[pos] not in _VALUE_TERMINATORS):
+                        return start
+                if key in wanted:
+                    entries[key] = value
+                after_entry = True
+
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf):
+                raise ValueError("Extra data after the TextMap object")
+            return pos
+        except IndexError:
+            # The buffer ends inside this entry
+            return start
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return start
+        finally:
+            self._after_entry = after_entry
+
+
+# ------------------------------------------------------------------------
+# STAR RAIL / ZZZ
+# ------------------------------------------------------------------------
+STARRAIL_TEXTMAP_FILES = {lang: f"TextMap/TextMap{lang.upper()}.json" for lang in CORE_LANGUAGES}
+ZZZ_TEXTMAP_FILES = {
+    "chs": "TextMap/TextMapTemplateTb.json",
+    "cht": "TextMap/TextMap_CHTTemplateTb.json",
+    "de": "TextMap/TextMap_DETemplateTb.json",
+    "en": "TextMap/TextMap_ENTemplateTb.json",
+    "es": "TextMap/TextMap_ESTemplateTb.json",
+    "fr": "TextMap/TextMap_FRTemplateTb.json",
+    "id": "TextMap/TextMap_IDTemplateTb.json",
+    "jp": "TextMap/TextMap_JATemplateTb.json",
+    "kr": "TextMap/TextMap_KOTemplateTb.json",
+    "pt": "TextMap/TextMap_PTTemplateTb.json",
+    "ru": "TextMap/TextMap_RUTemplateTb.json",
+    "th": "TextMap/TextMap_THTemplateTb.json",
+    "vi": "TextMap/TextMap_VITemplateTb.json",
+}
+
+
+def _fetch_game_files(game: str, base_url: str, files: dict[str, str], force: bool) -> dict[str, CachedFile]:
+    cached = fetch_files(base_url, files, force)
+    for f in cached.values():
+        if f.modified:
+            _pending_meta.setdefault(game, set()).add(f.path)
+    if not force and not any(f.modified for f in cached.values()):
+        raise UpstreamNotModified(f"No upstream changes for {game}")
+    return cached
+
+
+def fetch_starrail_update(force: bool = False):
     avatar_config_file = "ExcelOutput/AvatarConfig.json"
     weapon_config_file = "ExcelOutput/EquipmentConfig.json"
     resp = {}
 
-    avatar_config_data = json.loads(httpx.get(target_host + avatar_config_file).text)
-    weapon_config_data = json.loads(httpx.get(target_host + weapon_config_file).text)
-    chs_dict = json.loads(httpx.get(target_host + "TextMap/TextMapCHS.json").text)
-    cht_dict = json.loads(httpx.get(target_host + "TextMap/TextMapCHT.json").text)
-    de_dict = json.loads(httpx.get(target_host + "TextMap/TextMapDE.json").text)
-    en_dict = json.loads(httpx.get(target_host + "TextMap/TextMapEN.json").text)
-    es_dict = json.loads(httpx.get(target_host + "TextMap/TextMapES.json").text)
-    fr_dict = json.loads(httpx.get(target_host + "TextMap/TextMapFR.json").text)
-    id_dict = json.loads(httpx.get(target_host + "TextMap/TextMapID.json").text)
-    jp_dict = json.loads(httpx.get(target_host + "TextMap/TextMapJP.json").text)
-    kr_dict = json.loads(httpx.get(target_host + "TextMap/TextMapKR.json").text)
-    pt_dict = json.loads(httpx.get(target_host + "TextMap/TextMapPT.json").text)
-    ru_dict = json.loads(httpx.get(target_host + "TextMap/TextMapRU.json").text)
-    th_dict = json.loads(httpx.get(target_host + "TextMap/TextMapTH.json").text)
-    vi_dict = json.loads(httpx.get(target_host + "TextMap/TextMapVI.json").text)
-    dict_list = [chs_dict, cht_dict, de_dict, en_dict, es_dict, fr_dict, id_dict,
-                 jp_dict, kr_dict, pt_dict, ru_dict, th_dict, vi_dict]
-    item_list = avatar_config_data + weapon_config_data
-
-    try:
-        for file in os.listdir("dict/starrail"):
-            os.remove("dict/starrail/" + file)
-    except FileNotFoundError:
-        pass
+    files = _fetch_game_files("starrail", STARRAIL_DATA_URL, {
+        "avatar": avatar_config_file,
+        "weapon": weapon_config_file,
+        **STARRAIL_TEXTMAP_FILES,
+    }, force)
+    item_list = read_json(files["avatar"].path) + read_json(files["weapon"].path)
 
+    name_hash_ids = {}
     for item in item_list:
         if "AvatarID" in item:
             this_name_hash_id = str(item["AvatarName"]["Hash"])
@@ -171,32 +560,17 @@ def fetch_starrail_update():
             this_item_id = int(item["EquipmentID"])
         else:
             raise ValueError(f"Unknown item type: {item}")
+        name_hash_ids[this_item_id] = this_name_hash_id
 
-        name_list = [
-            lang_dict[this_name_hash_id] if this_name_hash_id in lang_dict.keys() else "" for
-            lang_dict in dict_list
-        ]
-        lang_dict = {
-            "chs": name_list[0],
-            "cht": name_list[1],
-            "de": name_list[2],
-            "en": name_list[3],
-            "es": name_list[4],
-            "fr": name_list[5],
-            "id": name_list[6],
-            "jp": name_list[7],
-            "kr": name_list[8],
-            "pt": name_list[9],
-            "ru": name_list[10],
-            "th": name_list[11],
-            "vi": name_list[12]
-        }
-        resp[this_item_id] = lang_dict
+    wanted = set(name_hash_ids.values())
+    textmaps = dict(zip(CORE_LANGUAGES, map_in_processes(
+        read_textmap, [files[lang].path for lang in CORE_LANGUAGES], [wanted] * len(CORE_LANGUAGES))))
+    for this_item_id, this_name_hash_id in name_hash_ids.items():
+        resp[this_item_id] = {lang: textmaps[lang].get(this_name_hash_id, "") for lang in CORE_LANGUAGES}
     return resp
 
 
-def fetch_zzz_update():
-    target_host = "https://git.mero.moe/dimbreath/ZenlessData/raw/branch/master/"
+def fetch_zzz_update(force: bool = False):
     avatar_config_file = "FileCfg/AvatarBaseTemplateTb.json"  # agent
     weapon_config_file = "FileCfg/ItemTemplateTb.json"  # w-engine and bangboo
     resp = {}
@@ -204,7 +578,13 @@ def fetch_zzz_update():
     name_hash_id = ""
     item_id = ""
 
-    avatar_config_data = json.loads(httpx.get(target_host + avatar_config_file).text)
+    files = _fetch_game_files("zzz", ZZZ_DATA_URL, {
+        "avatar": avatar_config_file,
+        "weapon": weapon_config_file,
+        **ZZZ_TEXTMAP_FILES,
+    }, force)
+
+    avatar_config_data = read_json(files["avatar"].path)
     key_name = list(avatar_config_data.keys())
     if len(key_name) == 1:
         avatar_config_data = avatar_config_data[key_name[0]]
@@ -218,7 +598,7 @@ def fetch_zzz_update():
     else:
         logger.info(f"Successfully fetched name_hash_id: [{name_hash_id}] and item_id: [{item_id}] from zzz")
 
-    weapon_config_data = json.loads(httpx.get(target_host + weapon_config_file).text)
+    weapon_config_data = read_json(files["weapon"].path)
     key_name = list(weapon_config_data.keys())
     if len(key_name) == 1:
         weapon_config_data = weapon_config_data[key_name[0]]
@@ -233,51 +613,14 @@ def fetch_zzz_update():
     weapon_config_data = list(filter(lambda x: is_valid_weapon_item(x[name_hash_id]), weapon_config_data))
 
     logger.info(f"Successfully fetched {len(avatar_config_data)} avatar items + {len(weapon_config_data)} weapon items from zzz")
-    chs_dict = json.loads(httpx.get(target_host + "TextMap/TextMapTemplateTb.json").text)
-    cht_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_CHTTemplateTb.json").text)
-    de_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_DETemplateTb.json").text)
-    en_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_ENTemplateTb.json").text)
-    es_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_ESTemplateTb.json").text)
-    fr_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_FRTemplateTb.json").text)
-    id_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_IDTemplateTb.json").text)
-    jp_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_JATemplateTb.json").text)
-    kr_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_KOTemplateTb.json").text)
-    pt_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_PTTemplateTb.json").text)
-    ru_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_RUTemplateTb.json").text)
-    th_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_THTemplateTb.json").text)
-    vi_dict = json.loads(httpx.get(target_host + "TextMap/TextMap_VITemplateTb.json").text)
-    dict_list = [chs_dict, cht_dict, de_dict, en_dict, es_dict, fr_dict, id_dict,
-                 jp_dict, kr_dict, pt_dict, ru_dict, th_dict, vi_dict]
     item_list = avatar_config_data + weapon_config_data
     logger.info(f"Successfully fetched {len(item_list)} items from zzz")
 
-    try:
-        for file in os.listdir("dict/zzz"):
-            os.remove("dict/zzz/" + file)
-    except FileNotFoundError:
-        pass
-
+    wanted = {item[name_hash_id] for item in item_list}
+    textmaps = dict(zip(CORE_LANGUAGES, map_in_processes(
+        read_textmap, [files[lang].path for lang in CORE_LANGUAGES], [wanted] * len(CORE_LANGUAGES))))
     for item in item_list:
         this_name_hash_id = item[name_hash_id]
         this_item_id = item[item_id]
-        name_list = [
-            lang_dict[this_name_hash_id] if this_name_hash_id in lang_dict.keys() else "" for
-            lang_dict in dict_list
-        ]
-        lang_dict = {
-            "chs": name_list[0],
-            "cht": name_list[1],
-            "de": name_list[2],
-            "en": name_list[3],
-            "es": name_list[4],
-            "fr": name_list[5],
-            "id": name_list[6],
-            "jp": name_list[7],
-            "kr": name_list[8],
-            "pt": name_list[9],
-            "ru": name_list[10],
-            "th": name_list[11],
-            "vi": name_list[12]
-        }
-        resp[this_item_id] = lang_dict
+        resp[this_item_id] = {lang: textmaps[lang].get(this_name_hash_id, "") for lang in CORE_LANGUAGES}
     return resp
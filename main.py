@@ -1,52 +1,84 @@
 # main.py
 import os
 import json
+import asyncio
+import functools
 import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager
-from typing import Dict, Generator, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
-import redis
-import sentry_sdk
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 import uvicorn
 from fastapi import (
-    BackgroundTasks,
-    Depends,
     FastAPI,
     Header,
     HTTPException,
+    Query,
     Request,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, RedirectResponse
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.starlette import StarletteIntegration
-from sqlalchemy import or_
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from api_config import (
     ACCEPTED_LANGUAGES,
     CORE_LANGUAGES,
     API_VERSION,
     DOCS_URL,
+    BATCH_MAX_ITEMS,
+    BATCH_MAX_TEXT_LENGTH,
+    DICT_CACHE_CONTROL,
+    DICT_HISTORY_DEPTH,
     LANGUAGE_PAIRS,
+    SEARCH_MAX_QUERY_LENGTH,
+    SEARCH_MAX_RESULTS,
+    MEMORY_INDEX_ENABLED,
+    REDIS_HOST,
+    REFRESH_LOCK_TTL,
+    REFRESH_POLICY,
+    REFRESH_WORKER_PROCESS,
     SENTRY_FULL_URL,
+    SENTRY_PROFILES_SAMPLE_RATE,
     TOKEN,
+    WORKERS,
     game_name_id_map,
 )
+import dict_store
+import metrics
 from base_logger import logger
-from db import crud, models
-from db.mysql_db import SessionLocal
-from db.schemas import TranslateRequest, TranslateResponse
-from fetcher import (
-    fetch_genshin_impact_update,
-    fetch_starrail_update,
-    fetch_zzz_update,
+from db import cache, crud, memory_index, models, search_index, snapshot
+from db.collation import fold
+from db.mysql_db import engine, run_in_session
+from db.schemas import BatchTranslateRequest, BatchTranslateResponse, TranslateRequest, TranslateResponse
+from refresh_scheduler import (
+    ALL_GAMES,
+    RefreshFailed,
+    RefreshRejected,
+    RefreshResult,
+    RefreshScheduler,
+    ReportPhase,
+    bump_generation,
+    follow_generations,
+    publish_phase,
+    publish_status,
+    read_generations,
 )
 
 # ---------------------------------------------------------------------
 # SENTRY
 # ---------------------------------------------------------------------
 if SENTRY_FULL_URL:
+    # Imported only when enabled; the SDK and its transport take a noticeable share of startup
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.starlette import StarletteIntegration
 
     def _before_send(event, hint):
         exc_info = hint.get("exc_info")
@@ -72,10 +104,15 @@ if SENTRY_FULL_URL:
             ),
         ],
         before_send=_before_send,
-        profiles_sample_rate=1.0,
+        profiles_sample_rate=SENTRY_PROFILES_SAMPLE_RATE,
         ignore_errors=[HTTPException],  # extra belt‑and‑suspenders
     )
 
+# ---------------------------------------------------------------------
+# METRICS
+# ---------------------------------------------------------------------
+metrics.instrument_engine(engine)
+
 
 # ---------------------------------------------------------------------
 # HELPERS
@@ -84,21 +121,183 @@ def get_game_id_by_name(name: str) -> Optional[int]:
     return game_name_id_map.get(name)
 
 
-md5_dict_cache: Dict[str, Dict[str, str]] = {}
+def to_core_language(lang: str) -> Optional[str]:
+    """
+    Map any accepted language code (e.g. "zh-cn") to its core short code (e.g. "chs").
+    """
+    lang = lang.lower()
+    if lang in CORE_LANGUAGES:
+        return lang
+    if lang in ACCEPTED_LANGUAGES:
+        return LANGUAGE_PAIRS[lang]
+    return None
 
 
-# ---------------------------------------------------------------------
-# DATABASE SESSION DEPENDENCY
-# ---------------------------------------------------------------------
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
-        yield db
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+md5_dict_cache: Dict[str, Dict[str, str]] = {}
+# game -> (MD5 of the checksum document, time it was generated)
+md5_dict_meta: Dict[str, Tuple[str, float]] = {}
+# game -> content version (MD5 of all.json) of the newest dictionaries published by any replica, as
+# shared through Redis; local files and snapshots of another version missed a refresh
+published_versions: Dict[str, str] = {}
+# game_id -> number of times load_memory_index published it; a load only publishes
+# the games nobody published after it started, so a slow build cannot undo a reload
+index_versions: Dict[int, int] = {}
+_index_publish_lock = threading.Lock()
+
+
+def load_memory_index(db: Session, game_ids: Optional[List[int]] = None, search: bool = True):
+    """
+    (Re)build the in-process indexes for the given games (all games by default) and swap them in.
+
+    Games with a snapshot file of the published version (see published_versions) are
+    mapped from it without querying MySQL; the others are built from i18n_dict. The search index is built unless search is
+    False; the translation index is only published when MEMORY_INDEX_ENABLED is set.
+    Games that another call published after this one started are left as they are.
+    """
+    if game_ids is None:
+        game_ids = list(game_name_id_map.values())
+    started_versions = dict(index_versions)
+    snapshots = {}
+    for game, game_id in game_name_id_map.items():
+        if game_id not in game_ids:
+            continue
+        path = snapshot.snapshot_path(game)
+        try:
+            mapped = snapshot.open_snapshot(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring {path}, building {game} from the database instead: {e}")
+            continue
+        if mapped is None:
+            continue
+        if published_versions.get(game, mapped.version) != mapped.version:
+            logger.warning(f"Ignoring {path}: it holds version {mapped.version or 'unknown'} but "
+                           f"{published_versions[game]} was published; building {game} from the database instead")
+            continue
+        logger.info(f"Mapped {path}: {mapped.n_items} items, {mapped.size} bytes")
+        snapshots[game_id] = mapped
+    missing = [game_id for game_id in game_ids if game_id not in snapshots]
+    index = memory_index.TranslationIndex.build(db, missing) if missing else memory_index.TranslationIndex()
+    index = index.with_games(memory_index.TranslationIndex(snapshots=snapshots))
+
+    search_indexes = {
+        game_id: search_index.GameSearchIndex(index.iter_entries(game_id))
+        for game_id in index.game_ids()
+    } if search else {}
+
+    with _index_publish_lock:
+        current = [game_id for game_id in index.game_ids()
+                   if index_versions.get(game_id, 0) == started_versions.get(game_id, 0)]
+        superseded = sorted(set(index.game_ids()) - set(current))
+        if superseded:
+            logger.info(f"Not publishing games {superseded}: they were reloaded while this index was built")
+        if search:
+            search_index.swap_game_indexes({game_id: search_indexes[game_id] for game_id in current})
+        if MEMORY_INDEX_ENABLED:
+            memory_index.swap_index(index.only(current), merge=True)
+        for game_id in current:
+            index_versions[game_id] = index_versions.get(game_id, 0) + 1
+
+
+async def resolve_item_ids(redis_client: aioredis.Redis, game_id: int, lang: str,
+                           texts: List[str]) -> List[Optional[Any]]:
+    """
+    Look up the item_id of each text: in-process index first, then Redis, then MySQL.
+
+    Unknown texts resolve to None. Results fetched from MySQL are written back to Redis.
+    Every layer compares names like MySQL's collation does, by their collation key.
+    """
+    if not all(isinstance(text, str) for text in texts):
+        # The list form of /translate accepts any JSON values; only strings can be names
+        names = iter(await resolve_item_ids(redis_client, game_id, lang, [t for t in texts if isinstance(t, str)]))
+        return [next(names) if isinstance(text, str) else None for text in texts]
+    index = memory_index.get_index()
+    if index.has_game(game_id):
+        metrics.record_cache("memory", len(texts), 0)
+        return [index.get_item_id(game_id, lang, text) for text in texts]
+    metrics.record_cache("memory", 0, len(texts))
+
+    cached = await cache.get_item_ids(redis_client, game_id, lang, texts)
+    misses = list(dict.fromkeys(text for text, ids in zip(texts, cached) if ids is None))
+    metrics.record_cache("redis", len(texts) - cached.count(None), cached.count(None))
+    found: Dict[str, List[Any]] = {}
+    if misses:
+        found = await run_in_session(crud.get_item_ids_by_texts, game_id, lang, misses)
+        await cache.cache_item_ids(redis_client, game_id, lang, found,
+                                   [text for text in misses if fold(text) not in found])
+
+    results = []
+    for text, ids in zip(texts, cached):
+        if ids is None:
+            ids = found.get(fold(text), [])
+        results.append(ids[0] if ids else None)
+    return results
+
+
+async def resolve_item_names(redis_client: aioredis.Redis, game_id: int, lang: str,
+                             item_ids: List[Any]) -> List[Optional[str]]:
+    """
+    Look up the text of each item_id in one language: in-process index, then Redis, then MySQL.
+
+    Unknown item IDs resolve to None; Redis remembers them as {} for CACHE_MISS_TTL.
+    """
+    index = memory_index.get_index()
+    if index.has_game(game_id):
+        metrics.record_cache("memory", len(item_ids), 0)
+        return [index.get_item_name(game_id, lang, item_id) for item_id in item_ids]
+    metrics.record_cache("memory", 0, len(item_ids))
+
+    cached = await cache.get_items(redis_client, game_id, item_ids)
+    metrics.record_cache("redis", len(item_ids) - cached.count(None), cached.count(None))
+    misses = list(dict.fromkeys(str(i) for i, texts in zip(item_ids, cached) if texts is None))
+    found: Dict[str, Dict[str, str]] = {}
+    if misses:
+        found = await run_in_session(crud.get_items_by_ids, game_id, misses)
+        await cache.cache_items(redis_client, game_id, found,
+                                [item_id for item_id in misses if item_id not in found])
+
+    results = []
+    for item_id, texts in zip(item_ids, cached):
+        if texts is None:
+            texts = found.get(str(item_id))
+        # {} is a cached miss: known not to exist, no need to ask MySQL again
+        results.append(texts[f"{lang}_text"] if texts else None)
+    return results
+
+
+async def resolve_matching_items(redis_client: aioredis.Redis, game_id: int, word: str) -> Dict[Any, List[str]]:
+    """
+    Map every item_id whose name equals word in some core language to those languages.
+
+    Answered from the in-process inverted index when loaded, otherwise from one
+    Redis MGET over all languages, falling back to MySQL.
+    """
+    index = memory_index.get_index()
+    if index.has_game(game_id):
+        metrics.record_cache("memory", 1, 0)
+        return dict(index.find_items(game_id, word))
+    metrics.record_cache("memory", 0, 1)
+
+    matches: Dict[Any, List[str]] = {}
+    cached = await cache.get_text_in_all_languages(redis_client, game_id, word)
+    hit = all(ids is not None for ids in cached)
+    metrics.record_cache("redis", int(hit), int(not hit))
+    if hit:
+        for lang_code, ids in zip(CORE_LANGUAGES, cached):
+            for item_id in ids:
+                matches.setdefault(item_id, []).append(lang_code)
+        return matches
+
+    results = await run_in_session(crud.find_items_by_text, game_id, word)
+    found: Dict[str, List[Any]] = {}
+    key = fold(word)
+    for row in results:
+        for lang_code in CORE_LANGUAGES:
+            text = getattr(row, f"{lang_code}_text")
+            if text and fold(text) == key:
+                matches.setdefault(row.item_id, []).append(lang_code)
+                found.setdefault(lang_code, []).append(row.item_id)
+    await cache.cache_text_in_all_languages(redis_client, game_id, word, found)
+    return matches
 
 
 # ---------------------------------------------------------------------
@@ -106,10 +305,46 @@ def get_db() -> Generator[Session, None, None]:
 # ---------------------------------------------------------------------
 @asynccontextmanager
 async def lifespan(fastapi_app: FastAPI):
-    redis_host = os.getenv("REDIS_HOST", "redis")
-    fastapi_app.state.redis_pool = redis.ConnectionPool.from_url(f"redis://{redis_host}", db=0)
+    fastapi_app.state.redis = cache.create_client(REDIS_HOST)
     logger.info("Connected to Redis")
+    # Generations already reflected in this process; a refresh in any worker or replica bumps them
+    try:
+        fastapi_app.state.generations = await read_generations(fastapi_app.state.redis)
+    except RedisError as e:
+        logger.warning(f"Could not read dictionary generations: {e}")
+        fastapi_app.state.generations = {}
+    # Checksums are in place before the first request, so /md5 never has to compute them.
+    # This also learns the published versions, which decide whether the local snapshots are current.
+    await restore_checksums(fastapi_app.state.redis, list(game_name_id_map))
+    # Warm start: map the games that have a current snapshot before accepting traffic. This reads no
+    # MySQL and takes milliseconds; the search index is left to the background build below.
+    snapshot_games = []
+    for game, game_id in game_name_id_map.items():
+        version = snapshot.read_version(snapshot.snapshot_path(game))
+        if version is not None and published_versions.get(game, version) == version:
+            snapshot_games.append(game_id)
+    if snapshot_games:
+        await run_in_session(load_memory_index, snapshot_games, False)
+    # Build the rest of the index in the background; until it is ready lookups go through Redis/MySQL
+    fastapi_app.state.index_task = asyncio.create_task(run_in_session(load_memory_index))
+    fastapi_app.state.index_task.add_done_callback(log_index_build_failure)
+    fastapi_app.state.generation_task = asyncio.create_task(
+        follow_generations(fastapi_app.state.redis, fastapi_app.state.generations, reload_game))
+    fastapi_app.state.refresh_pool = None
+    fastapi_app.state.refresh_scheduler = RefreshScheduler(
+        fastapi_app.state.redis, run_refresh, policy=REFRESH_POLICY, lock_ttl=REFRESH_LOCK_TTL)
     yield
+    await fastapi_app.state.refresh_scheduler.close()
+    fastapi_app.state.generation_task.cancel()
+    if fastapi_app.state.refresh_pool is not None:
+        fastapi_app.state.refresh_pool.shutdown(wait=False, cancel_futures=True)
+    await fastapi_app.state.redis.aclose()
+
+
+def log_index_build_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background index build failed; lookups keep using Redis/MySQL until the next reload",
+                     exc_info=task.exception())
 
 
 app = FastAPI(
@@ -125,6 +360,7 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(metrics.RouteMetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -144,19 +380,17 @@ async def root():
 
 # ---------- translate -------------------------------------------------
 @app.post("/translate", response_model=TranslateResponse, tags=["translate"])
-async def translate(request_data: TranslateRequest, db: Session = Depends(get_db)):
-    lang = request_data.lang.lower()
-    if lang not in CORE_LANGUAGES:
-        if lang in ACCEPTED_LANGUAGES:
-            lang = LANGUAGE_PAIRS[lang]
-        else:
-            raise HTTPException(status_code=403, detail="Language not supported")
+async def translate(request_data: TranslateRequest, request: Request):
+    lang = to_core_language(request_data.lang)
+    if lang is None:
+        raise HTTPException(status_code=403, detail="Language not supported")
 
     game_id = get_game_id_by_name(request_data.game)
     if game_id is None:
         raise HTTPException(status_code=403, detail="Game not supported")
 
     translate_type = request_data.type.lower()
+    redis_client = request.app.state.redis
 
     # -------- text -> id ---------------
     if translate_type == "normal":
@@ -164,8 +398,7 @@ async def translate(request_data: TranslateRequest, db: Session = Depends(get_db
         if not word:
             raise HTTPException(status_code=400, detail="item_name must be provided")
 
-        column_attr = crud.get_lang_column(lang)
-        if not column_attr:
+        if not crud.get_lang_column(lang):
             raise HTTPException(status_code=403, detail="Language not recognized")
 
         if word.startswith("[") and word.endswith("]"):
@@ -176,24 +409,13 @@ async def translate(request_data: TranslateRequest, db: Session = Depends(get_db
                     status_code=400,
                     detail="item_name must be a valid Python‑style JSON list",
                 )
-            rows = (
-                db.query(column_attr, getattr(column_attr.property.parent.class_, "item_id"))
-                .filter_by(game_id=game_id)
-                .filter(column_attr.in_(word_list))
-                .all()
-            )
-            text_to_id = {txt: iid for txt, iid in rows if txt}
-            return TranslateResponse(item_id=[text_to_id.get(w, 0) for w in word_list])
-
-        row = (
-            db.query(getattr(column_attr.property.parent.class_, "item_id"))
-            .filter_by(game_id=game_id)
-            .filter(column_attr == word)
-            .first()
-        )
-        if not row:
+            item_ids = await resolve_item_ids(redis_client, game_id, lang, word_list)
+            return TranslateResponse(item_id=[iid if iid is not None else 0 for iid in item_ids])
+
+        item_id = (await resolve_item_ids(redis_client, game_id, lang, [word]))[0]
+        if item_id is None:
             raise HTTPException(status_code=404, detail="Hash ID not found")
-        return TranslateResponse(item_id=row[0], item_name=word)
+        return TranslateResponse(item_id=item_id, item_name=word)
 
     # -------- id -> text ---------------
     elif translate_type == "reverse":
@@ -201,72 +423,121 @@ async def translate(request_data: TranslateRequest, db: Session = Depends(get_db
         if not item_id:
             raise HTTPException(status_code=400, detail="item_id must be provided")
 
-        column_attr = crud.get_lang_column(lang)
-        if not column_attr:
+        if not crud.get_lang_column(lang):
             raise HTTPException(status_code=403, detail="Language not recognized")
 
         if item_id.startswith("[") and item_id.endswith("]"):
-            item_id_list = json.loads(item_id)
-            rows = (
-                db.query(getattr(column_attr.property.parent.class_, "item_id"), column_attr)
-                .filter_by(game_id=game_id)
-                .filter(getattr(column_attr.property.parent.class_, "item_id").in_(item_id_list))
-                .all()
-            )
-            id_to_text = {iid: txt for iid, txt in rows}
-            return TranslateResponse(item_name=[id_to_text.get(iid, "") for iid in item_id_list])
-
-        row = (
-            db.query(column_attr)
-            .filter_by(game_id=game_id, item_id=item_id)
-            .first()
-        )
-        if not row:
+            try:
+                item_id_list = json.loads(item_id)
+            except json.JSONDecodeError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="item_id must be a valid Python‑style JSON list",
+                )
+            item_names = await resolve_item_names(redis_client, game_id, lang, item_id_list)
+            return TranslateResponse(item_name=[txt if txt is not None else "" for txt in item_names])
+
+        item_name = (await resolve_item_names(redis_client, game_id, lang, [item_id]))[0]
+        if item_name is None:
             raise HTTPException(status_code=404, detail="Word at this ID not found")
-        return TranslateResponse(item_name=row[0], item_id=item_id)
+        return TranslateResponse(item_name=item_name, item_id=item_id)
 
     raise HTTPException(status_code=403, detail="Translate type not supported")
 
 
+@app.post(
+    "/translate/batch",
+    response_model=BatchTranslateResponse,
+    tags=["translate"],
+    description=(
+        "Translate many items in one call; each lookup has its own game, lang and type. "
+        "Results are returned in input order. A `normal` lookup that is not found has "
+        "`item_id: null`; a `reverse` lookup that is not found has `item_name: null`.\n\n"
+        f"Limits: at most {BATCH_MAX_ITEMS} lookups per request and "
+        f"{BATCH_MAX_TEXT_LENGTH} characters per `item_name`."
+    ),
+)
+async def translate_batch(request_data: BatchTranslateRequest, request: Request):
+    redis_client = request.app.state.redis
+
+    # (game_id, lang, type) -> positions in the request
+    groups: Dict[tuple, List[int]] = {}
+    for pos, item in enumerate(request_data.items):
+        key = (get_game_id_by_name(item.game), to_core_language(item.lang), item.type)
+        groups.setdefault(key, []).append(pos)
+
+    results: List[Optional[TranslateResponse]] = [None] * len(request_data.items)
+    for (game_id, lang, translate_type), positions in groups.items():
+        items = [request_data.items[pos] for pos in positions]
+        if translate_type == "normal":
+            item_ids = await resolve_item_ids(redis_client, game_id, lang, [i.item_name for i in items])
+            for pos, item, item_id in zip(positions, items, item_ids):
+                results[pos] = TranslateResponse(item_id=item_id, item_name=item.item_name)
+        else:
+            item_names = await resolve_item_names(redis_client, game_id, lang, [i.item_id for i in items])
+            for pos, item, item_name in zip(positions, items, item_names):
+                results[pos] = TranslateResponse(item_id=item.item_id, item_name=item_name)
+
+    return BatchTranslateResponse(count=len(results), results=results)
+
+
 # ---------- identify --------------------------------------------------
 @app.get("/identify/{game}/{word}", tags=["translate"])
-async def identify_item_in_i18n(game: str, word: str, db: Session = Depends(get_db)):
+async def identify_item_in_i18n(game: str, word: str, request: Request):
     game_id = get_game_id_by_name(game)
     if game_id is None:
         raise HTTPException(status_code=404, detail="Game not supported")
 
-    or_clauses = [
-        (col := crud.get_lang_column(lang_code)) == word
-        for lang_code in CORE_LANGUAGES
-        if (col := crud.get_lang_column(lang_code)) is not None
-    ]
-    if not or_clauses:
-        raise HTTPException(status_code=500, detail="No valid language columns found")
-
-    results = (
-        db.query(models.I18nDict)
-        .filter(models.I18nDict.game_id == game_id, or_(*or_clauses))
-        .all()
-    )
-    if not results:
+    matches = await resolve_matching_items(request.app.state.redis, game_id, word)
+    if not matches:
         raise HTTPException(status_code=404, detail="Hash ID not found")
 
     reversed_lp = {v: k for k, v in LANGUAGE_PAIRS.items()}
-    matched_items = []
-    for row in results:
-        langs = [
-            reversed_lp.get(code, code)
-            for code in CORE_LANGUAGES
-            if getattr(row, f"{code}_text") == word
-        ]
-        matched_items.append({"item_id": row.item_id, "matched_langs": langs})
-
+    matched_items = [
+        {"item_id": item_id, "matched_langs": [reversed_lp.get(code, code) for code in langs]}
+        for item_id, langs in sorted(matches.items(), key=lambda m: cache.item_id_sort_key(m[0]))
+    ]
     return {"count": len(matched_items), "matched": matched_items}
 
 
+# ---------- search ----------------------------------------------------
+@app.get("/search/{game}", tags=["translate"])
+async def search_item(
+        game: str,
+        q: str = Query(min_length=1, max_length=SEARCH_MAX_QUERY_LENGTH),
+        lang: Optional[str] = None,
+        limit: int = Query(default=10, ge=1, le=SEARCH_MAX_RESULTS),
+):
+    """
+    Prefix and typo-tolerant search over every language (or only `lang`) of a game.
+
+    Width, case, spacing and punctuation are ignored. Results are ordered by
+    score: 1.0 for an exact match, then prefix matches, then fuzzy matches.
+    """
+    game_id = get_game_id_by_name(game)
+    if game_id is None:
+        raise HTTPException(status_code=404, detail="Game not supported")
+
+    core_lang = None
+    if lang is not None:
+        core_lang = to_core_language(lang)
+        if core_lang is None:
+            raise HTTPException(status_code=403, detail="Language not supported")
+
+    index = search_index.get_game_index(game_id)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search index is not ready yet")
+
+    reversed_lp = {v: k for k, v in LANGUAGE_PAIRS.items()}
+    results = index.search(q, limit=limit, lang=core_lang)
+    for result in results:
+        result["lang"] = reversed_lp.get(result["lang"], result["lang"])
+    return {"count": len(results), "results": results}
+
+
 # ---------- dict download --------------------------------------------
 @app.get("/dict/{game}/{lang}.json", tags=["dictionary"])
-async def download_language_dict_json(game: str, lang: str, db: Session = Depends(get_db)):
+async def download_language_dict_json(game: str, lang: str, request: Request):
     lang = lang.lower()
     if lang not in ACCEPTED_LANGUAGES and lang not in {"all", "md5"}:
         if len(lang) == 5 and lang in LANGUAGE_PAIRS:
@@ -276,117 +547,587 @@ async def download_language_dict_json(game: str, lang: str, db: Session = Depend
 
     file_path = f"dict/{game}/{lang}.json"
     if os.path.exists(file_path):
-        return FileResponse(path=file_path, filename=f"{lang}.json", media_type="application/json")
+        return dict_file_response(request, file_path, f"{lang}.json", "application/json", lang)
 
-    if lang in ACCEPTED_LANGUAGES and make_language_dict_json(lang, game, db):
-        return FileResponse(path=file_path, filename=f"{lang}.json", media_type="application/json")
+    # Building the file queries MySQL and writes to disk, so keep it off the event loop
+    if lang in ACCEPTED_LANGUAGES and await run_in_session(lambda db: make_language_dict_json(lang, game, db)):
+        return dict_file_response(request, file_path, f"{lang}.json", "application/json", lang)
 
     raise HTTPException(status_code=400, detail="Invalid request")
 
 
-def make_language_dict_json(lang: str, game: str, db: Session) -> bool:
+@app.get("/dict/{game}/{lang}.msgpack", tags=["dictionary"])
+async def download_language_dict_msgpack(game: str, lang: str, request: Request):
+    """
+    Columnar MessagePack variant of the dictionary; see "Binary Dictionary Format" in the README.
+    """
+    if game not in game_name_id_map:
+        raise HTTPException(status_code=403, detail="Game name not accepted")
+    lang = lang.lower()
+    if lang != "all":
+        lang = to_core_language(lang)
+        if lang is None:
+            raise HTTPException(status_code=403, detail="Language not supported")
+
+    file_path = f"dict/{game}/{lang}.msgpack"
+    if not os.path.exists(file_path):
+        await run_in_session(make_game_msgpack, game)
+    return dict_file_response(request, file_path, f"{lang}.msgpack", "application/vnd.msgpack", lang,
+                              dict_store.BINARY_CHECKSUM_FILE)
+
+
+@app.get("/dict/{game}/{lang}/diff", tags=["dictionary"])
+async def download_language_dict_diff(game: str, lang: str, since: str):
+    """
+    Changes to dict/{game}/{lang}.json since the version whose MD5 is `since`.
+
+    Returns `added` and `changed` {text: item_id} entries plus `removed` texts.
+    When `since` is older than the retained history, `full` is true and
+    `added` holds the whole current dictionary, which replaces the client's copy.
+    """
+    if game not in game_name_id_map:
+        raise HTTPException(status_code=403, detail="Game name not accepted")
+    core_lang = to_core_language(lang)
+    if core_lang is None:
+        raise HTTPException(status_code=403, detail="Language not supported")
+    current = md5_dict_cache.get(game, {}).get(core_lang)
+    if current is None:
+        raise HTTPException(status_code=404, detail="No checksum yet for this dictionary")
+
+    diff = await run_in_threadpool(make_dict_diff, game, core_lang, since, current)
+    return JSONResponse(content=diff, headers={"Cache-Control": DICT_CACHE_CONTROL})
+
+
+def make_dict_diff(game: str, lang: str, since: str, current: str) -> Dict[str, Any]:
+    # `since` comes from the client: only diffs against a retained generation are memoized
+    diff = make_generation_diff(game, lang, since, current) if dict_store.has_generation(game, lang, since) else None
+    if diff is None:
+        return {"from": since, "to": current, "full": True, "added": load_current_dict(game, lang, current),
+                "changed": {}, "removed": []}
+    return diff
+
+
+@lru_cache(maxsize=256)
+def make_generation_diff(game: str, lang: str, since: str, current: str) -> Optional[Dict[str, Any]]:
+    old = dict_store.load_generation(game, lang, since)
+    if old is None:
+        return None
+    new = load_current_dict(game, lang, current)
+    return {"from": since, "to": current, "full": False, **dict_store.diff_dicts(old, new)}
+
+
+def load_current_dict(game: str, lang: str, current: str) -> Dict[str, Any]:
+    new = dict_store.load_generation(game, lang, current)
+    if new is None:
+        with open(f"dict/{game}/{lang}.json", "rb") as f:
+            new = json.load(f)
+    return new
+
+
+def dict_file_response(request: Request, file_path: str, filename: str, media_type: str,
+                       checksum_key: str, checksum_file: str = dict_store.CHECKSUM_FILE) -> Response:
+    """
+    Serve a dictionary file with validators taken from its entry in the checksum document next to it.
+
+    The checksum is read from disk rather than md5_dict_cache, which another
+    process's refresh only updates after renaming the new files into place.
+
+    Answers 304 when the client's copy is current; otherwise uses a pre-compressed
+    variant when the client accepts one.
+    """
+    last_modified = os.stat(file_path).st_mtime
+    headers = {
+        "Vary": "Accept-Encoding",
+        "Cache-Control": DICT_CACHE_CONTROL,
+        "Last-Modified": dict_store.format_http_date(last_modified),
+    }
+    variant = dict_store.negotiate_encoding(request.headers.get("accept-encoding"), file_path)
+    encoding = variant[0] if variant is not None else None
+    checksum = dict_store.published_checksum(variant[1] if variant is not None else file_path,
+                                             checksum_key, checksum_file)
+    if checksum is not None:
+        headers["ETag"] = dict_store.make_etag(checksum, encoding)
+
+    if dict_store.is_not_modified(request.headers, checksum, last_modified):
+        return Response(status_code=304, headers=headers)
+    if variant is not None:
+        headers["Content-Encoding"] = encoding
+        file_path = variant[1]
+    response = FileResponse(path=file_path, filename=filename, media_type=media_type, headers=headers,
+                            stat_result=os.stat(file_path))
+    if checksum is None:
+        # FileResponse adds an mtime-size ETag that is_not_modified would never match; without a
+        # published checksum the client revalidates with Last-Modified instead
+        del response.headers["etag"]
+    return response
+
+
+def make_language_dict_json(lang: str, game: str, db: Session, out_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Write {lang}.json into out_dir (dict/{game} by default) and return its MD5, or None if nothing was written.
+    """
     game_id = get_game_id_by_name(game)
     if not game_id:
-        return False
+        return None
     col_attr = crud.get_lang_column(lang)
     if not col_attr:
-        return False
+        return None
 
+    out_dir = out_dir or f"dict/{game}"
     rows = db.query(models.I18nDict.item_id, col_attr).filter_by(game_id=game_id).all()
-    os.makedirs(f"dict/{game}", exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
     lang_dict = {text: iid for iid, text in rows if text}
 
-    with open(f"dict/{game}/{lang}.json", "w", encoding="utf-8") as f:
-        json.dump(lang_dict, f, indent=4, ensure_ascii=False)
-    return True
+    return dict_store.write_json_artifact(os.path.join(out_dir, f"{lang}.json"), lang_dict)
+
+
+def make_game_msgpack(db: Session, game: str, out_dir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Write {lang}.msgpack for every core language plus all.msgpack into out_dir (dict/{game} by default).
+
+    Their MD5s, keyed by lang ("all" included), are written to dict_store.BINARY_CHECKSUM_FILE
+    next to them and returned.
+    """
+    game_id = get_game_id_by_name(game)
+    if not game_id:
+        return {}
+    out_dir = out_dir or f"dict/{game}"
+
+    rows = sorted(db.query(models.I18nDict).filter_by(game_id=game_id).all(),
+                  key=lambda row: cache.item_id_sort_key(row.item_id))
+    item_ids = [int(row.item_id) if str(row.item_id).isdigit() else row.item_id for row in rows]
+    names = {lang: [getattr(row, f"{lang}_text") or "" for row in rows] for lang in CORE_LANGUAGES}
+    os.makedirs(out_dir, exist_ok=True)
+
+    checksum = {}
+    for lang in CORE_LANGUAGES:
+        # Per-language files only list items that have a name in that language, like the JSON files
+        present = [i for i, text in enumerate(names[lang]) if text]
+        checksum[lang] = dict_store.write_artifact(
+            os.path.join(out_dir, f"{lang}.msgpack"),
+            dict_store.pack_columnar(game, [item_ids[i] for i in present], {lang: [names[lang][i] for i in present]}),
+        )
+    checksum["all"] = dict_store.write_artifact(
+        os.path.join(out_dir, "all.msgpack"), dict_store.pack_columnar(game, item_ids, names))
+    dict_store.atomic_write(os.path.join(out_dir, dict_store.BINARY_CHECKSUM_FILE),
+                            json.dumps(checksum, indent=2).encode("utf-8"))
+    return checksum
 
 
 # ---------- refresh ---------------------------------------------------
+# Declared before /refresh/{game} so that "status" is not taken for a game name
+@app.get("/refresh/status", tags=["refresh"])
+async def refresh_status(request: Request):
+    return await request.app.state.refresh_scheduler.status()
+
+
 @app.get("/refresh/{game}", tags=["refresh"])
 async def refresh(
         game: str,
-        background_tasks: BackgroundTasks,
         request: Request,
+        force: bool = Query(False, description="Re-download and reload even if upstream reports no change"),
         x_uigf_token: str = Header(None),
 ):
     if x_uigf_token != TOKEN:
         raise HTTPException(status_code=403, detail="Token not accepted")
+    # "all" refreshes every game in one job, fetching and loading them concurrently
+    if game not in game_name_id_map and game != ALL_GAMES:
+        raise HTTPException(status_code=403, detail="Game name not accepted")
 
-    redis_client = redis.Redis.from_pool(request.app.state.redis_pool)
-    logger.info("Received refresh request for %s", game)
-    background_tasks.add_task(force_refresh_local_data, game, redis_client)
-    return {"status": "Background refresh task added"}
-
-
-def force_refresh_local_data(game: str, redis_client: redis.Redis):
-    db = SessionLocal()
+    logger.info("Received refresh request for %s (force=%s)", game, force)
     try:
-        if game == "genshin":
-            localization_dict, game_id = fetch_genshin_impact_update(), 1
-        elif game == "starrail":
-            localization_dict, game_id = fetch_starrail_update(), 2
-        elif game == "zzz":
-            localization_dict, game_id = fetch_zzz_update(), 3
-        else:
-            logger.error("Unsupported game: %s", game)
-            return
+        status = await request.app.state.refresh_scheduler.submit(game, force)
+    except RefreshRejected as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": status, "game": game}
+
+
+async def _skip_phase_report(phase: str):
+    pass
+
+
+def create_refresh_pool() -> ProcessPoolExecutor:
+    """
+    A fresh spawned process for one refresh job, so the parsing and serialization work stays off
+    this process's GIL and the memory it used is returned when the job ends.
+    """
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+
+async def run_refresh(game: str, force: bool, report_phase: ReportPhase) -> str:
+    """
+    Refresh a game in a worker process (or in-process when disabled), then reload this process's caches.
+    """
+    if not REFRESH_WORKER_PROCESS:
+        result = await force_refresh_local_data(game, app.state.redis, force, report_phase)
+    else:
+        app.state.refresh_pool = pool = create_refresh_pool()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(pool, refresh_in_worker, game, force)
+        finally:
+            app.state.refresh_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+    metrics.observe_refresh(game, result.durations, result.items)
+    for g in (list(game_name_id_map) if game == ALL_GAMES else [game]):
+        if g in result.published:
+            await reload_game(g, await bump_generation(app.state.redis, g, app.state.generations))
+        elif not memory_index.get_index().has_game(game_name_id_map[g]):
+            await run_in_session(load_memory_index, [game_name_id_map[g]])
+    if result.failed:
+        raise RefreshFailed(result.outcome)
+    return result.outcome
+
+
+async def reload_game(game: str, generation: Optional[int] = None):
+    """
+    Reload this process's index and checksums of game after a refresh published a new generation.
+    """
+    # Checksums first: they tell whether the local snapshot is the one just published
+    await restore_checksums(app.state.redis, [game])
+    await run_in_session(load_memory_index, [game_name_id_map[game]])
+    logger.info(f"Reloaded the index and checksums of {game} (generation {generation})")
+
+
+def refresh_in_worker(game: str, force: bool) -> RefreshResult:
+    """
+    Entry point of the refresh worker process; phases are reported straight to the shared status in Redis.
+    """
+    async def refresh_with_own_client():
+        redis_client = cache.create_client(REDIS_HOST)
+        try:
+            return await force_refresh_local_data(
+                game, redis_client, force, functools.partial(publish_phase, redis_client, game))
+        finally:
+            await redis_client.aclose()
+
+    return asyncio.run(refresh_with_own_client())
+
+
+async def force_refresh_local_data(game: str, redis_client: aioredis.Redis, force: bool = False,
+                                   report_phase: ReportPhase = _skip_phase_report) -> RefreshResult:
+    """
+    Fetch, load and publish one game, or every game when game is "all".
+
+    For "all" the games are fetched and loaded concurrently, each in its own
+    transaction and reporting its phases and final state ("done", "unchanged" or
+    "failed") under its own status; the changed games' dictionaries and checksums
+    are then rebuilt together. A failed game does not stop the others; it is listed
+    in RefreshResult.failed.
+    """
+    report_phase = metrics.PhaseTimer(report_phase)
+    games = list(game_name_id_map) if game == ALL_GAMES else [game]
+    started_at = time.time()
+
+    if game == ALL_GAMES:
+        for g in games:
+            await publish_status(redis_client, g, {}, state="running", phase=None, progress=0.0,
+                                 started_at=started_at, error=None)
+        # Each game reports its own phases; this job's "fetch" phase spans every game's fetch and load
+        await report_phase("fetch")
+        loaded = await asyncio.gather(*(
+            load_game_data(g, redis_client, force, functools.partial(publish_phase, redis_client, g),
+                           report_phase.items)
+            for g in games
+        ), return_exceptions=True)
+    else:
+        loaded = [await load_game_data(game, redis_client, force, report_phase, report_phase.items)]
+
+    outcomes: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    changed = []
+    for g, result in zip(games, loaded):
+        if isinstance(result, BaseException):
+            # One unreachable upstream must not hold back the other games
+            logger.error(f"Refresh of {g} failed", exc_info=result)
+            errors[g] = f"{type(result).__name__}: {result}"
+            continue
+        outcomes[g], needs_publish = result
+        if needs_publish:
+            changed.append(g)
 
-        logger.info("Fetched %d items for %s", len(localization_dict), game)
-        crud.clear_game_data(db, game_id)
-        crud.insert_localization_data(db, redis_client, game_id, localization_dict)
-        db.commit()
+    try:
+        if changed:
+            await report_phase("dict_build")
+            published = await asyncio.gather(*(run_in_session(make_game_dict_files, g) for g in changed))
+            report_phase.items["dict_build"] = sum(files for files, _ in published)
+
+            await report_phase("checksum")
+            for g, (_, checksum) in zip(changed, published):
+                await publish_checksum(redis_client, g, checksum)
+    except Exception as e:
+        if game == ALL_GAMES:
+            errors.update((g, f"{type(e).__name__}: {e}") for g in changed)
+            await publish_game_states(redis_client, games, outcomes, errors, changed, started_at)
+        raise
 
+    # Upstream validators only count once the data they describe is in MySQL and dict/
+    import fetcher
+    for g in outcomes:
+        fetcher.commit_cache_meta(g)
+
+    if game != ALL_GAMES:
+        return RefreshResult(outcomes[game], changed, [], report_phase.finish(), report_phase.items)
+    await publish_game_states(redis_client, games, outcomes, errors, changed, started_at)
+    summary = "; ".join(f"{g}: {outcomes[g]}" if g in outcomes else f"{g}: failed ({errors[g]})" for g in games)
+    return RefreshResult(summary, changed, list(errors), report_phase.finish(), report_phase.items)
+
+
+async def publish_game_states(redis_client: aioredis.Redis, games: List[str], outcomes: Dict[str, str],
+                              errors: Dict[str, str], changed: List[str], started_at: float):
+    """
+    Record how each game of an "all" job ended in its own status document.
+    """
+    finished_at = time.time()
+    for g in games:
+        if g in errors:
+            state, result, error = "failed", None, errors[g]
+        else:
+            state, result, error = ("done" if g in changed else "unchanged"), outcomes[g], None
+        await publish_status(redis_client, g, {}, state=state, phase=None,
+                             progress=None if state == "failed" else 1.0, result=result, error=error,
+                             finished_at=finished_at, last_duration=round(finished_at - started_at, 3))
+
+
+async def load_game_data(game: str, redis_client: aioredis.Redis, force: bool, report_phase: ReportPhase,
+                         items: Dict[str, int]) -> Tuple[str, bool]:
+    """
+    Fetch one game and apply the changes to MySQL and Redis.
+
+    Returns a short description of the outcome and whether the game's dictionaries
+    must be rebuilt. Items fetched and rows changed are added to items.
+    """
+    # Imported on first refresh: serving never needs httpx, zipfile or the parse pool
+    import fetcher
+    if game == "genshin":
+        fetch, game_id = fetcher.fetch_genshin_impact_update, 1
+    elif game == "starrail":
+        fetch, game_id = fetcher.fetch_starrail_update, 2
+    elif game == "zzz":
+        fetch, game_id = fetcher.fetch_zzz_update, 3
+    else:
+        raise ValueError(f"Unsupported game: {game}")
+
+    await report_phase("fetch")
+    # Upstream "not modified" only means something if this game was loaded and published before
+    force = force or not os.path.exists(f"dict/{game}/all.json") or dict_store.is_publish_pending(game)
+    try:
+        localization_dict = await run_in_threadpool(fetch, force)
+    except fetcher.UpstreamNotModified as e:
+        logger.info("%s; skipping refresh", e)
+        return "upstream not modified", False
+    logger.info("Fetched %d items for %s", len(localization_dict), game)
+    items["fetch"] = items.get("fetch", 0) + len(localization_dict)
+
+    await report_phase("db_load")
+    # An earlier refresh may have committed to MySQL and then failed to publish; its marker stays until a publish
+    published = not dict_store.is_publish_pending(game)
+    dict_store.mark_publish_pending(game)
+    # Only changed rows are written; old rows stay visible to readers until the single commit
+    changes = await run_in_session(crud.insert_localization_data, game_id, localization_dict)
+    items["db_load"] = items.get("db_load", 0) + sum(len(rows) for rows in changes.values())
+    if (not force and published and not any(changes.values()) and os.path.exists(f"dict/{game}/all.json")
+            and snapshot.is_compatible(snapshot.snapshot_path(game))):
+        dict_store.clear_publish_pending(game)
+        logger.info("No changes for %s; keeping the current cache and dictionary files", game)
+        return "no changes", False
+    await cache.apply_changes(redis_client, game_id, localization_dict, changes)
+    return (f"{len(changes['inserted'])} inserted, {len(changes['updated'])} updated, "
+            f"{len(changes['deleted'])} deleted"), True
+
+
+def make_game_dict_files(db: Session, game: str) -> Tuple[int, Dict[str, str]]:
+    """
+    Publish every dictionary file of a game and return the number of files and their checksum document.
+    """
+    # Build the whole generation in a staging directory, then rename it into dict/{game}
+    with dict_store.staged_game_dir(game) as staging:
+        # Checksums are taken from the bytes as they are written, so nothing is read back to hash it
+        checksum = {}
         for language in CORE_LANGUAGES:
-            make_language_dict_json(language, game, db)
+            checksum[language] = make_language_dict_json(language, game, db, staging)
 
-        all_dict = {
-            language: json.load(open(f"dict/{game}/{language}.json", encoding="utf-8"))
-            for language in CORE_LANGUAGES
-        }
-        with open(f"dict/{game}/all.json", "w", encoding="utf-8") as f:
-            json.dump(all_dict, f, indent=4, ensure_ascii=False)
-
-        make_checksum(game)
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+        all_dict = {}
+        for language in CORE_LANGUAGES:
+            with open(os.path.join(staging, f"{language}.json"), encoding="utf-8") as f:
+                all_dict[language] = json.load(f)
+        checksum["all"] = dict_store.write_json_artifact(os.path.join(staging, "all.json"), all_dict)
+        make_game_msgpack(db, game, staging)
+        dict_store.atomic_write(os.path.join(staging, dict_store.CHECKSUM_FILE),
+                                json.dumps(checksum, indent=2).encode("utf-8"))
+        # Lookup snapshot mapped by every serving process, renamed into place with the dictionaries
+        dict_store.atomic_write(os.path.join(staging, snapshot.SNAPSHOT_FILE),
+                                snapshot.build_snapshot(db, game_name_id_map[game], checksum["all"]))
+        published = len(os.listdir(staging))
+    dict_store.clear_publish_pending(game)
+    return published, checksum
 
 
 # ---------- checksum --------------------------------------------------
 @app.get("/md5/{game}", tags=["checksum"])
-async def get_checksum(game: str, background_tasks: BackgroundTasks):
+async def get_checksum(game: str, request: Request):
     if game not in game_name_id_map:
         raise HTTPException(status_code=403, detail="Game name not accepted")
+    # Loaded at startup and on every refresh; a miss means the game has no dictionaries yet
     if game not in md5_dict_cache:
-        background_tasks.add_task(make_checksum, game)
-        return {"status": "No checksum yet; generating"}
-    return md5_dict_cache[game]
-
-
-def make_checksum(game: str):
-    if game not in game_name_id_map and game != "all":
-        return False
-
-    work_list = [game] if game in game_name_id_map else list(game_name_id_map.keys())
-    for g in work_list:
-        dict_path = f"dict/{g}"
-        os.makedirs(dict_path, exist_ok=True)
-        json_files = [f for f in os.listdir(dict_path) if f.endswith(".json") and "md5" not in f]
-        if not json_files:
-            logger.warning("No JSON dictionary for %s; skipping checksum", g)
+        raise HTTPException(status_code=404, detail="No checksum yet for this game")
+
+    return checksum_response(request, md5_dict_cache[game], *md5_dict_meta[game])
+
+
+@app.get("/md5/{game}/msgpack", tags=["checksum"])
+async def get_binary_checksum(game: str, request: Request):
+    """
+    MD5 of each binary dictionary, keyed by lang like /md5/{game} ("all" is all.msgpack).
+    """
+    if game not in game_name_id_map:
+        raise HTTPException(status_code=403, detail="Game name not accepted")
+    published = dict_store.read_checksum_document(os.path.join("dict", game, dict_store.BINARY_CHECKSUM_FILE))
+    if published is None:
+        raise HTTPException(status_code=404, detail="No checksum yet for this game")
+    stat, checksum = published
+    return checksum_response(request, checksum, document_checksum(checksum), stat.st_mtime)
+
+
+def checksum_response(request: Request, checksum: Dict[str, str], document_md5: str,
+                      generated_at: float) -> Response:
+    headers = {
+        "Cache-Control": DICT_CACHE_CONTROL,
+        "ETag": dict_store.make_etag(document_md5),
+        "Last-Modified": dict_store.format_http_date(generated_at),
+    }
+    if dict_store.is_not_modified(request.headers, document_md5, generated_at):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=checksum, headers=headers)
+
+
+async def publish_checksum(redis_client: aioredis.Redis, game: str, checksum: Dict[str, str]):
+    """
+    Archive the new generation of game and share its checksum document through Redis.
+    """
+    generated_at = time.time()
+    await run_in_threadpool(archive_generations, game, checksum)
+    set_checksum(game, checksum, generated_at)
+    await cache.store_checksum(redis_client, game, checksum, generated_at)
+
+
+def archive_generations(game: str, checksum: Dict[str, str]):
+    for lang in CORE_LANGUAGES:
+        if lang in checksum:
+            dict_store.archive_generation(game, lang, checksum[lang], DICT_HISTORY_DEPTH)
+
+
+def make_checksum(game: str) -> Optional[Dict[str, str]]:
+    """
+    Hash the published dictionary files of game and write dict/{game}/md5.json
+    (plus md5.msgpack.json when there are binary dictionaries).
+
+    Refreshes record checksums as they write the files; this is only needed for
+    dictionaries published without an md5.json.
+    """
+    dict_path = f"dict/{game}"
+    if not os.path.isdir(dict_path):
+        return None
+    checksum = {}
+    binary_checksum = {}
+    for name in sorted(os.listdir(dict_path)):
+        if name.endswith(".json") and "md5" not in name:
+            checksum[name[:-5]] = dict_store.file_md5(os.path.join(dict_path, name))
+        elif name.endswith(".msgpack"):
+            binary_checksum[name[:-8]] = dict_store.file_md5(os.path.join(dict_path, name))
+    if binary_checksum:
+        dict_store.atomic_write(os.path.join(dict_path, dict_store.BINARY_CHECKSUM_FILE),
+                                json.dumps(binary_checksum, indent=2).encode("utf-8"))
+    if not checksum:
+        logger.warning("No JSON dictionary for %s; skipping checksum", game)
+        return None
+
+    archive_generations(game, checksum)
+    dict_store.atomic_write(os.path.join(dict_path, dict_store.CHECKSUM_FILE),
+                            json.dumps(checksum, indent=2).encode("utf-8"))
+    return checksum
+
+
+def document_checksum(checksum: Dict[str, str]) -> str:
+    return hashlib.md5(json.dumps(checksum, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def set_checksum(game: str, checksum: Dict[str, str], generated_at: float):
+    # Documents published before the binary checksums moved to /md5/{game}/msgpack may still list them
+    checksum = {key: value for key, value in checksum.items() if not key.endswith(".msgpack")}
+    md5_dict_cache[game] = checksum
+    md5_dict_meta[game] = (document_checksum(checksum), generated_at)
+
+
+async def restore_checksums(redis_client: aioredis.Redis, games: List[str]):
+    """
+    Load the checksum documents of games for the files in dict/{game}.
+
+    The copy shared through Redis is adopted when it describes the same files (same
+    all.json), so every worker and replica reports the same generation time. A local
+    md5.json that is newer (e.g. Redis was unreachable during the refresh) is stored
+    in Redis for the others. One that is older missed a refresh: it keeps being served,
+    so /md5 agrees with the ETags, until the files are rebuilt from MySQL in the background.
+    Dictionaries published without an md5.json are hashed once.
+    """
+    stored = await cache.load_checksums(redis_client)
+    for game in games:
+        path = os.path.join("dict", game, dict_store.CHECKSUM_FILE)
+        published = stored.get(game)
+        if published is not None and published[0].get("all"):
+            published_versions[game] = published[0]["all"]
+        local = dict_store.read_checksum_document(path)
+        if local is None and await run_in_threadpool(make_checksum, game) is not None:
+            local = dict_store.read_checksum_document(path)
+        if local is None:
+            if published is not None:
+                logger.warning(f"{game} was published, but dict/{game} has no dictionaries; rebuilding them")
+                schedule_local_rebuild(game)
             continue
 
-        checksum = {}
-        for jf in json_files:
-            with open(os.path.join(dict_path, jf), "rb") as rf:
-                checksum[jf[:-5]] = hashlib.md5(rf.read()).hexdigest()
+        stat, checksum = local
+        if published is not None and published[0].get("all") == checksum.get("all"):
+            set_checksum(game, *published)
+            continue
+        set_checksum(game, checksum, stat.st_mtime)
+        if published is None or stat.st_mtime > published[1]:
+            await cache.store_checksum(redis_client, game, md5_dict_cache[game], stat.st_mtime)
+            if checksum.get("all"):
+                published_versions[game] = checksum["all"]
+        else:
+            logger.warning(f"dict/{game} is older than the published dictionaries; rebuilding it")
+            schedule_local_rebuild(game)
+
+
+_local_rebuilds: Dict[str, asyncio.Task] = {}
+
+
+def schedule_local_rebuild(game: str):
+    task = _local_rebuilds.get(game)
+    if task is None or task.done():
+        _local_rebuilds[game] = asyncio.create_task(rebuild_local_files(game))
+
+
+async def rebuild_local_files(game: str):
+    """
+    Republish dict/{game} from MySQL after this replica's copy missed a refresh.
+
+    The other replicas already serve this data, so no generation is announced.
+    """
+    try:
+        _, checksum = await run_in_session(make_game_dict_files, game)
+        set_checksum(game, checksum, time.time())
+        await run_in_session(load_memory_index, [game_name_id_map[game]])
+    except Exception:
+        logger.exception(f"Rebuilding the dictionaries of {game} failed")
+        return
+    logger.info(f"Rebuilt the dictionaries of {game} from the database")
+
 
-        md5_dict_cache[g] = checksum
-        with open(os.path.join(dict_path, "md5.json"), "w", encoding="utf-8") as wf:
-            json.dump(checksum, wf, indent=2)
-    return True
+# ---------- metrics ---------------------------------------------------
+@app.get("/metrics", tags=["metrics"], include_in_schema=False)
+async def get_metrics():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
 
 
 # ---------- debug -----------------------------------------------------
@@ -397,6 +1138,11 @@ async def trigger_error():
 
 # ---------- startup ---------------------------------------------------
 if __name__ == "__main__":
+    # Refresh parsing spawns worker processes, which re-run this executable when frozen by PyInstaller
+    multiprocessing.freeze_support()
     for gname in game_name_id_map:
         os.makedirs(f"./dict/{gname}", exist_ok=True)
-    uvicorn.run(app, host="0.0.0.0", port=8900, proxy_headers=True, forwarded_allow_ips="*")
+    # Several workers need an import string; each worker imports main and keeps its own caches,
+    # kept in sync through the refresh generations in Redis
+    uvicorn.run("main:app" if WORKERS > 1 else app, host="0.0.0.0", port=8900, workers=WORKERS,
+                proxy_headers=True, forwarded_allow_ips="*")
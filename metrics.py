@@ -0,0 +1,167 @@
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from refresh_scheduler import ReportPhase
+
+
+# ------------------------------------------------------------------------
+# METRICS
+# ------------------------------------------------------------------------
+# With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty directory so
+# /metrics aggregates every worker instead of reporting whichever one answered.
+REQUEST_LATENCY = Histogram(
+    "uigf_request_duration_seconds", "Request latency by route template",
+    ["route", "method", "status"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "uigf_db_query_duration_seconds", "MySQL statement latency by statement type",
+    ["statement"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+CACHE_LOOKUPS = Counter(
+    "uigf_cache_lookups_total", "Lookups answered (hit) or passed on (miss) by each cache layer",
+    ["layer", "result"],
+)
+REFRESH_PHASE_LATENCY = Histogram(
+    "uigf_refresh_phase_duration_seconds", "Duration of each refresh phase",
+    ["game", "phase"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+REFRESH_PHASE_ITEMS = Gauge(
+    "uigf_refresh_phase_items", "Items handled by the last run of each refresh phase "
+    "(fetch: items downloaded, db_load: rows changed, dict_build: files published)",
+    ["game", "phase"],
+    multiprocess_mode="mostrecent",
+)
+
+
+def render() -> Tuple[bytes, str]:
+    """
+    Body and content type of the /metrics response.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# ------------------------------------------------------------------------
+# ROUTES
+# ------------------------------------------------------------------------
+class RouteMetricsMiddleware:
+    """
+    ASGI middleware observing REQUEST_LATENCY for every request that matched a route.
+
+    Routes are labelled by their template (e.g. /dict/{game}/{lang}.json) to keep the label set small.
+    """
+
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope it was given
+            route = scope.get("route")
+            path = getattr(route, "path", None)
+            if path is not None and path not in self.skip_paths:
+                REQUEST_LATENCY.labels(path, scope["method"], str(status)).observe(time.perf_counter() - started)
+
+
+# ------------------------------------------------------------------------
+# DATABASE AND CACHES
+# ------------------------------------------------------------------------
+def instrument_engine(engine: Engine):
+    """
+    Observe DB_QUERY_LATENCY for every statement run through engine.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        kind = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+        if kind not in {"select", "insert", "update", "delete"}:
+            kind = "other"
+        DB_QUERY_LATENCY.labels(kind).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+
+def record_cache(layer: str, hits: int, misses: int):
+    if hits:
+        CACHE_LOOKUPS.labels(layer, "hit").inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(layer, "miss").inc(misses)
+
+
+# ------------------------------------------------------------------------
+# REFRESH PHASES
+# ------------------------------------------------------------------------
+class PhaseTimer:
+    """
+    ReportPhase wrapper timing each phase until the next one starts (or finish() is called).
+
+    Meant to run wherever the refresh runs; the collected durations and item
+    counts are handed back and observed with observe_refresh() in the serving process.
+    """
+
+    def __init__(self, report_phase: ReportPhase):
+        self.report_phase = report_phase
+        self.durations: Dict[str, float] = {}
+        self.items: Dict[str, int] = {}
+        self._phase: Optional[str] = None
+        self._started = 0.0
+
+    async def __call__(self, phase: str):
+        self.finish()
+        self._phase, self._started = phase, time.perf_counter()
+        await self.report_phase(phase)
+
+    def finish(self) -> Dict[str, float]:
+        if self._phase is not None:
+            self.durations[self._phase] = time.perf_counter() - self._started
+            self._phase = None
+        return self.durations
+
+
+def observe_refresh(game: str, durations: Dict[str, float], items: Dict[str, int]):
+    for phase, seconds in durations.items():
+        REFRESH_PHASE_LATENCY.labels(game, phase).observe(seconds)
+    for phase, count in items.items():
+        REFRESH_PHASE_ITEMS.labels(game, phase).set(count)
@@ -0,0 +1,297 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import redis.asyncio as aioredis
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError, RedisError
+
+from base_logger import logger
+
+
+# ------------------------------------------------------------------------
+# KEYS AND PHASES
+# ------------------------------------------------------------------------
+# uigf:refresh:lock     -> "{game}:{token}" of the job running on any replica (expires without heartbeat)
+# uigf:refresh:status   -> hash {game: JSON status document}
+# uigf:refresh:generation -> hash {game: number of refreshes that published new dictionaries}
+# uigf:refresh:events   -> pub/sub channel, "{game}:{generation}" after each of those refreshes
+LOCK_KEY = "uigf:refresh:lock"
+STATUS_KEY = "uigf:refresh:status"
+GENERATION_KEY = "uigf:refresh:generation"
+EVENTS_CHANNEL = "uigf:refresh:events"
+REFRESH_PHASES = ["fetch", "db_load", "dict_build", "checksum"]
+# Job name covering every game; it folds in requests for any single game
+ALL_GAMES = "all"
+
+
+def phase_progress(phase: str) -> float:
+    return REFRESH_PHASES.index(phase) / len(REFRESH_PHASES)
+
+
+ReportPhase = Callable[[str], Awaitable[None]]
+RunRefresh = Callable[[str, bool, ReportPhase], Awaitable[str]]
+OnGeneration = Callable[[str, int], Awaitable[None]]
+
+
+class RefreshResult(NamedTuple):
+    """
+    What a refresh job hands back to the serving process (possibly from a worker process).
+    """
+    outcome: str
+    # Games whose new dictionaries were published, i.e. readers must reload their indexes and checksums
+    published: List[str]
+    # Games of an ALL_GAMES job that failed while the others went ahead
+    failed: List[str]
+    # Seconds spent in and items handled by each phase that ran
+    durations: Dict[str, float]
+    items: Dict[str, int]
+
+
+class RefreshFailed(Exception):
+    """
+    Raised by run_refresh when some games of a job failed; the job is reported as failed
+    even though the remaining games were published.
+    """
+
+
+class RefreshRejected(Exception):
+    """
+    Raised by RefreshScheduler.submit when another game is refreshing and the policy is "reject".
+    """
+
+    def __init__(self, running_game: str):
+        super().__init__(f"A refresh of {running_game} is in progress")
+        self.running_game = running_game
+
+
+# ------------------------------------------------------------------------
+# SCHEDULER
+# ------------------------------------------------------------------------
+class RefreshScheduler:
+    """
+    Runs at most one refresh at a time, across every replica sharing the Redis.
+
+    Requests for the game that is already running or queued (or for any game
+    while an ALL_GAMES job is) fold into that job.
+    Requests for other games are queued (and run one after another by a single
+    worker task) or rejected, depending on policy. The running job holds
+    LOCK_KEY, renewed every lock_ttl / 3 seconds, so a crashed replica frees it
+    after lock_ttl. Job progress is published to STATUS_KEY for /refresh/status.
+
+    If Redis is unreachable, jobs still run, single-flight within this process only.
+    """
+
+    def __init__(self, redis_client: aioredis.Redis, run_refresh: RunRefresh,
+                 policy: str = "queue", lock_ttl: int = 600):
+        self.redis = redis_client
+        self.run_refresh = run_refresh
+        self.policy = policy
+        self.lock_ttl = lock_ttl
+        self._queue: Deque[Tuple[str, bool]] = deque()
+        self._current: Optional[str] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        # Last known status per game, used when Redis is unavailable
+        self._status: Dict[str, Dict[str, Any]] = {}
+
+    async def submit(self, game: str, force: bool = False) -> str:
+        """
+        Schedule a refresh of game and return "started", "queued", "already running" or "already queued".
+        """
+        running = self._current or await self._locked_game()
+        if running in (game, ALL_GAMES):
+            return "already running"
+        for i, (queued_game, queued_force) in enumerate(self._queue):
+            if queued_game in (game, ALL_GAMES):
+                self._queue[i] = (queued_game, queued_force or force)
+                return "already queued"
+        if (running is not None or self._queue) and self.policy == "reject":
+            raise RefreshRejected(running or self._queue[0][0])
+
+        self._queue.append((game, force))
+        await self._publish(game, state="queued", queued_at=time.time())
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._work())
+        return "queued" if running is not None or len(self._queue) > 1 else "started"
+
+    async def status(self) -> Dict[str, Any]:
+        games = dict(self._status)
+        try:
+            for game, raw in (await self.redis.hgetall(STATUS_KEY)).items():
+                games[game.decode()] = json.loads(raw)
+        except RedisError as e:
+            logger.warning(f"Reading refresh status from Redis failed, showing local status: {e}")
+        return {
+            "running": self._current or await self._locked_game(),
+            "queue": [game for game, _ in self._queue],
+            "policy": self.policy,
+            "games": games,
+        }
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    # --------------------------------------------------------------------
+    async def _work(self):
+        while self._queue:
+            game, force = self._queue[0]
+            lock = await self._acquire(game)
+            self._queue.popleft()
+            self._current = game
+            try:
+                await self._run(game, force)
+            finally:
+                self._current = None
+                await self._release(lock)
+
+    async def _run(self, game: str, force: bool):
+        started_at = time.time()
+        await self._publish(game, state="running", phase=None, progress=0.0, started_at=started_at, error=None)
+
+        async def report_phase(phase: str):
+            await self._publish(game, phase=phase, progress=phase_progress(phase))
+
+        try:
+            result = await self.run_refresh(game, force, report_phase)
+            state, error = "done", None
+        except Exception as e:
+            logger.exception(f"Refresh of {game} failed")
+            result, state, error = None, "failed", f"{type(e).__name__}: {e}"
+        finished_at = time.time()
+        await self._publish(game, state=state, phase=None, progress=1.0 if state == "done" else None,
+                            result=result, error=error, finished_at=finished_at,
+                            last_duration=round(finished_at - started_at, 3))
+        logger.info(f"Refresh of {game} {state} in {finished_at - started_at:.1f}s ({result or error})")
+
+    # --------------------------------------------------------------------
+    async def _locked_game(self) -> Optional[str]:
+        try:
+            holder = await self.redis.get(LOCK_KEY)
+        except RedisError:
+            return None
+        return holder.decode().split(":", 1)[0] if holder else None
+
+    async def _acquire(self, game: str) -> Optional[Lock]:
+        """
+        Wait for the cross-replica lock; returns None when Redis is unavailable.
+        """
+        lock = self.redis.lock(LOCK_KEY, timeout=self.lock_ttl, sleep=1.0)
+        try:
+            await lock.acquire(token=f"{game}:{uuid.uuid4().hex}")
+        except RedisError as e:
+            logger.warning(f"Refresh lock unavailable, running {game} without it: {e}")
+            return None
+        self._heartbeat = asyncio.create_task(self._keep_alive(lock))
+        return lock
+
+    async def _keep_alive(self, lock: Lock):
+        while True:
+            await asyncio.sleep(self.lock_ttl / 3)
+            try:
+                await lock.reacquire()
+            except (LockError, RedisError) as e:
+                logger.warning(f"Could not renew the refresh lock: {e}")
+
+    async def _release(self, lock: Optional[Lock]):
+        if lock is None:
+            return
+        self._heartbeat.cancel()
+        try:
+            await lock.release()
+        except (LockError, RedisError) as e:
+            logger.warning(f"Could not release the refresh lock: {e}")
+
+    async def _publish(self, game: str, **fields: Any):
+        await publish_status(self.redis, game, self._status.setdefault(game, {}), **fields)
+
+
+# ------------------------------------------------------------------------
+# STATUS DOCUMENTS
+# ------------------------------------------------------------------------
+async def publish_status(redis_client: aioredis.Redis, game: str, status: Dict[str, Any], **fields: Any):
+    """
+    Merge fields into the game's status document, starting from the shared copy in Redis.
+
+    status is the caller's local copy, updated in place (and used on its own when Redis is down).
+    """
+    try:
+        shared = await redis_client.hget(STATUS_KEY, game)
+        if shared:
+            status.update(json.loads(shared))
+        status.update(fields)
+        await redis_client.hset(STATUS_KEY, game, json.dumps(status))
+    except RedisError as e:
+        status.update(fields)
+        logger.warning(f"Writing refresh status to Redis failed: {e}")
+
+
+async def publish_phase(redis_client: aioredis.Redis, game: str, phase: str):
+    """
+    ReportPhase implementation for code running outside the scheduler, e.g. in the refresh worker process.
+    """
+    await publish_status(redis_client, game, {}, phase=phase, progress=phase_progress(phase))
+
+
+# ------------------------------------------------------------------------
+# GENERATIONS
+# ------------------------------------------------------------------------
+async def read_generations(redis_client: aioredis.Redis) -> Dict[str, int]:
+    return {game.decode(): int(generation)
+            for game, generation in (await redis_client.hgetall(GENERATION_KEY)).items()}
+
+
+async def bump_generation(redis_client: aioredis.Redis, game: str, seen: Dict[str, int]) -> Optional[int]:
+    """
+    Announce that new dictionaries of game were published, so every serving process reloads them.
+
+    seen is the caller's own generation map; it is advanced first so the caller skips its own event.
+    """
+    try:
+        generation = await redis_client.hincrby(GENERATION_KEY, game, 1)
+        seen[game] = generation
+        await redis_client.publish(EVENTS_CHANNEL, f"{game}:{generation}")
+    except RedisError as e:
+        logger.warning(f"Announcing the new generation of {game} failed; other workers keep their copy: {e}")
+        return None
+    return generation
+
+
+async def follow_generations(redis_client: aioredis.Redis, seen: Dict[str, int], on_change: OnGeneration,
+                             retry_delay: float = 5.0):
+    """
+    Call on_change(game, generation) for every generation newer than seen, published by any process sharing the Redis.
+
+    Runs until cancelled. After (re)subscribing it catches up from GENERATION_KEY,
+    so events published while the connection was down are not lost.
+    """
+    async def advance(game: str, generation: int):
+        if generation <= seen.get(game, 0):
+            return
+        seen[game] = generation
+        try:
+            await on_change(game, generation)
+        except Exception:
+            logger.exception(f"Reloading generation {generation} of {game} failed")
+
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(EVENTS_CHANNEL)
+                for game, generation in (await read_generations(redis_client)).items():
+                    await advance(game, generation)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        game, generation = message["data"].decode().rsplit(":", 1)
+                        await advance(game, int(generation))
+        except RedisError as e:
+            logger.warning(f"Lost the refresh event subscription, retrying in {retry_delay}s: {e}")
+            await asyncio.sleep(retry_delay)